@@ -0,0 +1,43 @@
+import argparse
+import sys
+
+from .api import CoinGeckoAPI
+from .export import DATASETS, FORMATS, export_snapshot
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m pycoingecko', description='pycoingecko command line tools')
+    subparsers = parser.add_subparsers(dest='command')
+    subparsers.required = True
+
+    export_parser = subparsers.add_parser('export', help='export a bulk snapshot to a parquet/arrow file')
+    export_parser.add_argument('dataset', choices=sorted(DATASETS))
+    export_parser.add_argument('path', help='output file')
+    export_parser.add_argument('--format', choices=FORMATS, default='parquet')
+    export_parser.add_argument('--vs-currency', default='usd', help='vs_currency (coins_markets only)')
+    export_parser.add_argument('--workers', type=int, default=4, help='pages fetched concurrently')
+    export_parser.add_argument('--deadline', type=float, default=None, help='overall time budget in seconds')
+    export_parser.add_argument('--api-key', default='', help='pro api key (default: COINGECKO_API_KEY)')
+
+    return parser
+
+
+def export_command(args):
+    cg = CoinGeckoAPI(api_key=args.api_key)
+    kwargs = {}
+    if args.dataset == 'coins_markets':
+        kwargs['vs_currency'] = args.vs_currency
+    rows = export_snapshot(cg, args.dataset, args.path, format=args.format, max_workers=args.workers,
+                           deadline=args.deadline, **kwargs)
+    print("Exported {0} rows of {1} to {2}".format(rows, args.dataset, args.path))
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'export':
+        export_command(args)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
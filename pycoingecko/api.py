@@ -1,40 +1,151 @@
+import copy
 import json
 from dotenv import load_dotenv
 import os
 import requests
-from requests.adapters import HTTPAdapter
-from requests.packages.urllib3.util.retry import Retry
 
-from .utils import func_args_preprocessing
+from . import timeouts
+from .exceptions import DeadlineExceeded
+from .hedging import HedgePolicy
+from .resilience import CircuitBreaker, StaleWhileRevalidate, is_failure_status
+from .transport import SessionTransport
+from .utils import called_method, func_args_preprocessing, get_endpoint, project_content, projection, raw_content
 
 
 class CoinGeckoAPI:
     __API_URL_BASE = 'https://api.coingecko.com/api/v3/'
     __PRO_API_URL_BASE = 'https://pro-api.coingecko.com/api/v3/'
 
-    def __init__(self, api_key: str = '', retries=5):
+    # params sent by a lean client (unless given) to drop the blocks of the payload we rarely read
+    LEAN_PARAMS = {
+        'get_coin_by_id': {'localization': False, 'tickers': False, 'community_data': False,
+                           'developer_data': False},
+        'get_coin_history_by_id': {'localization': False},
+    }
+
+    def __init__(self, api_key: str = '', retries=5, transport=None, circuit_breaker=None,
+                 stale_while_revalidate=None, hedging=None, connect_timeout=None, read_timeout=None,
+                 api_base_url=None, lean=False, session_per_thread=False, ledger=None):
         if api_key == '':
             api_key = os.environ.get('COINGECKO_API_KEY','')
         self.api_key = api_key
-        if api_key:
+        if api_base_url:
+            # e.g. a local caching proxy (python -m pycoingecko.proxy)
+            self.api_base_url = api_base_url if api_base_url.endswith('/') else api_base_url + '/'
+        elif api_key:
             self.api_base_url = self.__PRO_API_URL_BASE
         else:
             self.api_base_url = self.__API_URL_BASE
+        # send the payload-reducing params of LEAN_PARAMS by default
+        self.lean = lean
         self.request_timeout = 120
+        if connect_timeout is not None or read_timeout is not None:
+            self.request_timeout = (connect_timeout or self.request_timeout, read_timeout or self.request_timeout)
+
+        # transport sending the requests (see pycoingecko.transport for recording/replaying transports)
+        # (the default one creates its session lazily per process, and per thread with session_per_thread)
+        self.transport = transport if transport is not None else SessionTransport(retries=retries,
+                                                                                  per_thread=session_per_thread)
+
+        # optional per-endpoint circuit breaker and stale-while-revalidate cache (True for default settings)
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker = circuit_breaker or None
+        if stale_while_revalidate is True:
+            stale_while_revalidate = StaleWhileRevalidate()
+        self.stale_while_revalidate = stale_while_revalidate or None
+        # optional hedging of slow requests on latency-critical endpoints (True for default settings)
+        if hedging is True:
+            hedging = HedgePolicy()
+        self.hedging = hedging or None
+        # optional usage ledger counting the calls per method and tag, and enforcing budgets
+        self.ledger = ledger
+        self._pid = os.getpid()
+
+    def __setstate__(self, state):
+        # pickled components keep their settings only (e.g. clients sent to multiprocessing workers)
+        self.__dict__.update(state)
+        self._pid = os.getpid()
+
+    def __after_fork(self):
+        # locks, thread pools and circuit states inherited through a fork belong to the parent:
+        # replace the components with copies keeping their settings only
+        self._pid = os.getpid()
+        for name in ('circuit_breaker', 'stale_while_revalidate', 'hedging', 'ledger'):
+            component = getattr(self, name)
+            if component is not None:
+                setattr(self, name, copy.copy(component))
+
+    @property
+    def session(self):
+        return getattr(self.transport, 'session', None)
+
+    @staticmethod
+    def deadline(seconds):
+        """Return a context manager bounding all the calls made in it (retries, pages and batches included)
+
+        Calls running past the deadline raise DeadlineExceeded.
+        """
+        return timeouts.deadline(seconds)
+
+    def __get_response(self, url):
+        endpoint = get_endpoint(url)
+        deadline = timeouts.current_deadline()
+        if deadline is not None:
+            deadline.check({'endpoint': endpoint})
+        # budgets are checked first: a refused call must not take the trial call of a half-open circuit
+        if self.ledger is not None:
+            method = called_method.get() or endpoint
+            self.ledger.check(method)
+        trial = self.circuit_breaker is not None and self.circuit_breaker.before_request(endpoint)
+
+        def send():
+            if self.ledger is not None:
+                self.ledger.record(method)
+            return self.transport.get(url, timeout=timeout)
 
-        self.session = requests.Session()
-        retries = Retry(total=retries, backoff_factor=0.5, status_forcelist=[502, 503, 504])
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        try:
+            timeout = timeouts.request_timeout(self.request_timeout, {'endpoint': endpoint})
+            try:
+                if self.hedging is not None and self.hedging.applies(endpoint):
+                    response = self.hedging.send(endpoint, send)
+                else:
+                    response = send()
+            except requests.exceptions.RequestException as e:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.record_failure(endpoint, trial)
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded(deadline.seconds, {'endpoint': endpoint}) from e
+                raise
+
+            if self.circuit_breaker is not None:
+                if is_failure_status(response.status_code):
+                    self.circuit_breaker.record_failure(endpoint, trial)
+                else:
+                    self.circuit_breaker.record_success(endpoint, trial)
+            return response
+        finally:
+            if trial:
+                # a trial call ending without an outcome (e.g. any other error) frees the half-open circuit
+                self.circuit_breaker.release(endpoint)
 
     def __request(self, url):
-        try:
-            response = self.session.get(url, timeout=self.request_timeout)
-        except requests.exceptions.RequestException:
-            raise
+        if self._pid != os.getpid():
+            self.__after_fork()
+        if self.stale_while_revalidate is not None:
+            response = self.stale_while_revalidate.get(url, self.__get_response)
+        else:
+            response = self.__get_response(url)
 
         try:
             response.raise_for_status()
+            if raw_content.get():
+                return response.content
             content = json.loads(response.content.decode('utf-8'))
+            fields = projection.get()
+            if fields is not None:
+                # drop the unwanted subtrees right away so they are not kept alive with the response
+                content = project_content(content, fields)
             return content
         except Exception as e:
             try:
@@ -58,6 +169,7 @@ class CoinGeckoAPI:
         return api_url
 
     # ---------- PING ----------#
+    @func_args_preprocessing
     def ping(self, **kwargs):
         api_url = '{0}ping'.format(self.api_base_url)
         api_url = self.__api_url_params(api_url, kwargs)
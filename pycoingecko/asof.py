@@ -0,0 +1,176 @@
+"""As-of price lookups (numpy): price of coins at arbitrary timestamps, answered with binary searches
+
+Prices are fetched once per coin with /coins/{id}/market_chart/range over fixed windows of WINDOW
+seconds, only for the windows holding queried timestamps; a padded window stays within the longest
+range served with hourly points. Timestamps are unix seconds.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+import time
+
+from .paging import map_concurrent
+
+# 90 days: longer ranges of market_chart/range only have daily points
+MAX_HOURLY_RANGE = 90 * 24 * 60 * 60
+# 89 days, leaving up to a day for the padding of the fetched ranges
+WINDOW = MAX_HOURLY_RANGE - 24 * 60 * 60
+
+MODES = ('previous', 'nearest', 'interpolate')
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for as-of lookups (pip install numpy)")
+
+
+def _group(coins, n):
+    """Return [(coin, indexes of its queries)] for n coins"""
+
+    # encode the coins with a dict (much faster than np.unique on strings), then group them with one sort
+    index = {}
+    codes = np.fromiter((index.setdefault(coin, len(index)) for coin in coins), dtype=np.int64, count=n)
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(index) + 1))
+    return [(coin, order[bounds[code]:bounds[code + 1]]) for code, coin in enumerate(index)]
+
+
+class AsOfPrices:
+    """Sorted price series per coin, answering batched as-of queries
+
+    fetch() gets the windows of the queried timestamps not fetched yet, lookup() answers any number
+    of (coin, timestamp) queries with one binary search per coin.
+    """
+
+    def __init__(self, vs_currency='usd', padding=3600):
+        _require_numpy()
+        if padding > MAX_HOURLY_RANGE - WINDOW:
+            raise ValueError("padding must be at most {0} seconds".format(MAX_HOURLY_RANGE - WINDOW))
+        self.vs_currency = vs_currency
+        # fetched ranges start padding seconds early, so that the first timestamps of a window have a previous price
+        self.padding = padding
+        # coin -> (timestamps, prices) sorted by timestamp
+        self._series = {}
+        # coin -> indexes of the fetched windows
+        self._windows = {}
+
+    def __contains__(self, coin):
+        return coin in self._series
+
+    def series(self, coin):
+        """Return the (timestamps, prices) arrays of a coin"""
+
+        return self._series.get(coin, (np.zeros(0), np.zeros(0)))
+
+    def add(self, coin, timestamps, prices):
+        """Merge prices at timestamps (seconds) into the series of a coin"""
+
+        old_timestamps, old_prices = self.series(coin)
+        # new points first: unique keeps the first of equal timestamps after the stable sort
+        timestamps = np.concatenate([np.asarray(timestamps, dtype=np.float64), old_timestamps])
+        prices = np.concatenate([np.asarray(prices, dtype=np.float64), old_prices])
+        order = np.argsort(timestamps, kind='stable')
+        timestamps, index = np.unique(timestamps[order], return_index=True)
+        self._series[coin] = (timestamps, prices[order][index])
+
+    def missing_windows(self, coin, timestamps):
+        """Return the indexes of the windows holding timestamps that were not fetched yet"""
+
+        windows = np.unique(np.floor_divide(np.asarray(timestamps, dtype=np.float64), WINDOW).astype(np.int64))
+        fetched = self._windows.get(coin, set())
+        return [int(window) for window in windows if window not in fetched]
+
+    def fetch(self, cg, coins, timestamps, max_workers=4, limiter=None):
+        """Fetch the prices of the windows covering the queries not fetched yet, return the number of requests
+
+        coins and timestamps are parallel arrays (or coins a single coin for all timestamps).
+        """
+
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if isinstance(coins, str):
+            groups = [(coins, slice(None))]
+        else:
+            groups = _group(coins, len(timestamps))
+        tasks = [(coin, window)
+                 for coin, selected in groups
+                 for window in self.missing_windows(coin, timestamps[selected])]
+
+        def fetch_window(task):
+            coin, window = task
+            start = window * WINDOW
+            return cg.get_coin_market_chart_range_by_id(coin, self.vs_currency, start - self.padding,
+                                                        start + WINDOW)
+
+        charts = map_concurrent(fetch_window, tasks, max_workers=max_workers, limiter=limiter)
+        for (coin, window), chart in zip(tasks, charts):
+            prices = np.asarray(chart.get('prices') or [], dtype=np.float64).reshape(-1, 2)
+            self.add(coin, prices[:, 0] / 1000.0, prices[:, 1])
+            if (window + 1) * WINDOW < time.time():
+                # the current window gets new prices: fetch it again next time
+                self._windows.setdefault(coin, set()).add(window)
+        return len(tasks)
+
+    def lookup(self, coins, timestamps, mode='previous', tolerance=None):
+        """Return the prices of coins at timestamps (parallel arrays, or a single coin for all timestamps)
+
+        mode is previous (last price at or before the timestamp), nearest or interpolate (linear between
+        the surrounding prices). Prices are nan when no price qualifies, or when the closest price is
+        more than tolerance seconds away.
+        """
+
+        if mode not in MODES:
+            raise ValueError("Unknown mode '{0}' (expected one of {1})".format(mode, ', '.join(MODES)))
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if isinstance(coins, str):
+            return self._lookup(coins, timestamps, mode, tolerance)
+
+        values = np.full(len(timestamps), np.nan)
+        for coin, selected in _group(coins, len(timestamps)):
+            values[selected] = self._lookup(coin, timestamps[selected], mode, tolerance)
+        return values
+
+    def _lookup(self, coin, queries, mode, tolerance):
+        times, prices = self.series(coin)
+        values = np.full(len(queries), np.nan)
+        if not len(times):
+            return values
+
+        right = np.searchsorted(times, queries, side='right')
+        previous = right - 1
+        following = np.minimum(right, len(times) - 1)
+        has_previous = previous >= 0
+        previous = np.maximum(previous, 0)
+        previous_distance = np.where(has_previous, queries - times[previous], np.inf)
+        following_distance = np.where(times[following] >= queries, times[following] - queries, np.inf)
+
+        if mode == 'previous':
+            values[has_previous] = prices[previous[has_previous]]
+            distance = previous_distance
+        elif mode == 'nearest':
+            use_following = following_distance < previous_distance
+            index = np.where(use_following, following, previous)
+            distance = np.minimum(previous_distance, following_distance)
+            found = np.isfinite(distance)
+            values[found] = prices[index[found]]
+        else:
+            inside = (queries >= times[0]) & (queries <= times[-1])
+            values[inside] = np.interp(queries[inside], times, prices)
+            distance = np.where(inside, np.minimum(previous_distance, following_distance), np.inf)
+
+        if tolerance is not None:
+            values[distance > tolerance] = np.nan
+        return values
+
+
+def get_prices_asof(cg, coins, timestamps, vs_currency='usd', mode='previous', tolerance=None, prices=None,
+                    max_workers=4, limiter=None):
+    """Return the prices of coins at timestamps (see AsOfPrices.lookup), fetching the covering ranges
+
+    Pass an AsOfPrices as prices to reuse the ranges fetched by earlier calls.
+    """
+
+    if prices is None:
+        prices = AsOfPrices(vs_currency)
+    prices.fetch(cg, coins, timestamps, max_workers=max_workers, limiter=limiter)
+    return prices.lookup(coins, timestamps, mode=mode, tolerance=tolerance)
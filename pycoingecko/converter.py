@@ -0,0 +1,132 @@
+import threading
+import time
+
+
+class CurrencyConverter:
+    """Convert prices between currencies locally using the BTC-based /exchange_rates table
+
+    The rate table is cached for ttl seconds and refreshed on demand, or periodically by a background
+    thread (see start()). This allows requesting a single vs_currency from /simple/price and deriving
+    the others locally.
+    """
+
+    def __init__(self, cg, ttl=300, refresh_interval=None):
+        self.cg = cg
+        self.ttl = ttl
+        self.refresh_interval = refresh_interval if refresh_interval is not None else ttl
+        # (time of the refresh, {currency: btc rate}), or None before the first refresh
+        self._table = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def refresh(self):
+        """Fetch the exchange rates table and return it as {currency: btc rate}"""
+
+        response = self.cg.get_exchange_rates()
+        rates = {currency.lower(): float(data['value']) for currency, data in response['rates'].items()}
+        # swap the table and its time at once so that readers never see a partial update
+        self._table = (time.time(), rates)
+        return rates
+
+    @property
+    def updated_at(self):
+        table = self._table
+        return table[0] if table is not None else None
+
+    def _expired(self, table):
+        return table is None or time.time() - table[0] > self.ttl
+
+    @property
+    def rates(self):
+        table = self._table
+        if self._expired(table):
+            with self._lock:
+                # another thread may have refreshed the table while waiting for the lock
+                if self._expired(self._table):
+                    self.refresh()
+                table = self._table
+        return table[1]
+
+    def currencies(self):
+        """Return the supported currencies"""
+
+        return sorted(self.rates)
+
+    def rate(self, from_currency, to_currency):
+        """Return the multiplier converting an amount in from_currency to to_currency"""
+
+        rates = self.rates
+        from_currency, to_currency = from_currency.lower(), to_currency.lower()
+        for currency in (from_currency, to_currency):
+            if currency not in rates:
+                raise ValueError("Unsupported currency '{0}'".format(currency))
+        return rates[to_currency] / rates[from_currency]
+
+    def convert(self, values, from_currency, to_currency):
+        """Convert a value or a vector of values (list, tuple or numpy array) between currencies"""
+
+        rate = self.rate(from_currency, to_currency)
+        if isinstance(values, (list, tuple)):
+            return [None if value is None else value * rate for value in values]
+        if values is None:
+            return None
+        # scalars and numpy arrays
+        return values * rate
+
+    def convert_prices(self, prices, to_currencies, from_currency='usd'):
+        """Add to_currencies to the output of get_price requested in from_currency
+
+        Prices, market caps and 24h volumes are converted; 24h changes and last_updated_at are
+        left as they are.
+        """
+
+        from_currency = from_currency.lower()
+        if isinstance(to_currencies, str):
+            to_currencies = to_currencies.split(',')
+        rates = {currency.lower(): self.rate(from_currency, currency) for currency in to_currencies}
+
+        converted = {}
+        for coin, data in prices.items():
+            data = dict(data)
+            for currency, rate in rates.items():
+                for suffix in ('', '_market_cap', '_24h_vol'):
+                    value = data.get(from_currency + suffix)
+                    if value is not None:
+                        data[currency + suffix] = value * rate
+            converted[coin] = data
+        return converted
+
+    def start(self):
+        """Start refreshing the rates table in a background thread every refresh_interval seconds"""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pycoingecko-rates', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background refresh thread"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                with self._lock:
+                    self.refresh()
+            except Exception:
+                # keep serving the last table, try again on next interval
+                pass
+            self._stop.wait(self.refresh_interval)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
@@ -0,0 +1,66 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+
+class ProcessPoolDecoder:
+    """Decode and transform raw response contents in a pool of processes
+
+    The pagination/batching helpers accepting a decoder fetch responses undecoded (raw=True call
+    option) in their threads and hand the bytes to transform functions running in the pool, so that
+    parsing scales with the cores instead of being serialized by the GIL. Transforms must be module
+    level functions and should return compact results (arrays, arrow buffers) rather than dict trees.
+    """
+
+    def __init__(self, max_workers=None, mp_context=None):
+        self._executor = ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context)
+
+    def submit(self, transform, raw, *args):
+        return self._executor.submit(transform, raw, *args)
+
+    def run(self, transform, raw, *args):
+        """Return transform(raw, *args) computed in the pool"""
+
+        return self.submit(transform, raw, *args).result()
+
+    def close(self):
+        self._executor.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def decode_json(raw):
+    """Transform returning the decoded json content as is"""
+
+    return json.loads(raw)
+
+
+def coins_list_to_columns(raw):
+    """Transform flattening /coins/list?include_platform=true to columns
+
+    Return {'id', 'symbol', 'name'} lists and the platform contracts as parallel 'platform_coin'
+    (index in id), 'platform' and 'platform_address' lists.
+    """
+
+    columns = {'id': [], 'symbol': [], 'name': [], 'platform_coin': [], 'platform': [], 'platform_address': []}
+    for index, coin in enumerate(json.loads(raw)):
+        columns['id'].append(coin.get('id'))
+        columns['symbol'].append(coin.get('symbol'))
+        columns['name'].append(coin.get('name'))
+        for platform, address in (coin.get('platforms') or {}).items():
+            columns['platform_coin'].append(index)
+            columns['platform'].append(platform)
+            columns['platform_address'].append(address)
+    return columns
+
+
+def get_coins_list_columns(cg, include_platform=True, decoder=None, **kwargs):
+    """Return /coins/list as columns (see coins_list_to_columns), decoded in the decoder pool if given"""
+
+    raw = cg.get_coins_list(include_platform=include_platform, raw=True, **kwargs)
+    if decoder is None:
+        return coins_list_to_columns(raw)
+    return decoder.run(coins_list_to_columns, raw)
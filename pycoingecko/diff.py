@@ -0,0 +1,131 @@
+import hashlib
+import json
+
+# stable row keys of the polled endpoints
+KEY_FUNCTIONS = {
+    # get_coins_markets rows
+    'coins_markets': lambda row: row['id'],
+    # get_exchanges_tickers_by_id / get_coin_ticker_by_id 'tickers' rows
+    'tickers': lambda row: ((row.get('market') or {}).get('identifier'), row['base'], row['target']),
+    # get_derivatives rows
+    'derivatives': lambda row: (row['market'], row['symbol']),
+}
+
+
+# size of the digest kept per field
+DIGEST_SIZE = 8
+# digest of the fields missing from a row
+MISSING = bytes(DIGEST_SIZE)
+
+
+def _encode(value):
+    """Return a type-tagged canonical encoding of a field value"""
+
+    if value is None:
+        return b'n'
+    if isinstance(value, bool):
+        return b'b1' if value else b'b0'
+    if isinstance(value, int):
+        return b'i' + str(value).encode('ascii')
+    if isinstance(value, float):
+        # repr is exact, and the same for all the nan (unchanged from one snapshot to the next)
+        return b'f' + repr(value).encode('ascii')
+    if isinstance(value, str):
+        return b's' + value.encode('utf-8')
+    return b'j' + json.dumps(value, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')
+
+
+def _hash_value(value):
+    """Return a DIGEST_SIZE bytes fingerprint of a field value
+
+    The digest covers the type of the value: unlike hash(), it tells -1 from -2 and 1 from True.
+    """
+
+    return hashlib.blake2b(_encode(value), digest_size=DIGEST_SIZE).digest()
+
+
+class SnapshotDiff:
+    """Difference between two snapshots
+
+    added: rows whose key was not in the previous snapshot, removed: keys no longer present,
+    changed: {key: {field: new value}} for the rows with at least one changed field.
+    """
+
+    def __init__(self, added, removed, changed):
+        self.added = added
+        self.removed = removed
+        self.changed = changed
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.changed)
+
+    def __repr__(self):
+        return '<SnapshotDiff added={0} removed={1} changed={2}>'.format(
+            len(self.added), len(self.removed), len(self.changed))
+
+
+class SnapshotDiffer:
+    """Compute the rows added/removed/changed between consecutive snapshots of an endpoint in linear time
+
+    key is a function returning the stable key of a row or the name of a preset ('coins_markets',
+    'tickers', 'derivatives'). Fields listed in ignore (e.g. 'last_updated') are left out of the
+    comparison. Only the field digests of each row (DIGEST_SIZE bytes per field, in one bytes object)
+are kept between snapshots, not the rows.
+    """
+
+    def __init__(self, key, ignore=()):
+        self.key = KEY_FUNCTIONS[key] if isinstance(key, str) else key
+        self.ignore = frozenset(ignore)
+        self._fields = {}
+        # key -> field digests concatenated in the order of self._fields
+        self._previous = {}
+
+    def __len__(self):
+        return len(self._previous)
+
+    def _field_hashes(self, row):
+        hashes = [MISSING] * len(self._fields)
+        for field, value in row.items():
+            if field in self.ignore:
+                continue
+            index = self._fields.get(field)
+            if index is None:
+                index = self._fields[field] = len(self._fields)
+                hashes.append(MISSING)
+            hashes[index] = _hash_value(value)
+        # trailing fields missing from the row do not change its digests when new fields get known
+        while hashes and hashes[-1] == MISSING:
+            hashes.pop()
+        return b''.join(hashes)
+
+    def update(self, rows):
+        """Store a new snapshot and return its SnapshotDiff against the previous one"""
+
+        previous = self._previous
+        current = {}
+        added, changed = [], {}
+        names = None
+
+        for row in rows:
+            key = self.key(row)
+            hashes = self._field_hashes(row)
+            current[key] = hashes
+
+            old = previous.get(key)
+            if old is None:
+                added.append(row)
+            elif old != hashes:
+                if names is None or len(names) != len(self._fields):
+                    names = {index: field for field, index in self._fields.items()}
+                size = max(len(old), len(hashes))
+                # missing trailing digests compare as MISSING
+                old, new = old.ljust(size, b'\0'), hashes.ljust(size, b'\0')
+                fields = {names[i // DIGEST_SIZE]: row.get(names[i // DIGEST_SIZE])
+                          for i in range(0, size, DIGEST_SIZE)
+                          if old[i:i + DIGEST_SIZE] != new[i:i + DIGEST_SIZE]}
+                if fields:
+                    changed[key] = fields
+
+        removed = [key for key in previous if key not in current]
+        self._previous = current
+        return SnapshotDiff(added, removed, changed)
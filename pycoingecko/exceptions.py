@@ -0,0 +1,37 @@
+class CircuitOpenError(Exception):
+    """Raised without sending the request when the circuit of an endpoint is open"""
+
+    def __init__(self, endpoint, retry_after):
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+        super().__init__("Circuit open for endpoint '{0}' (retry in {1:.1f}s)".format(endpoint, retry_after))
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a call (including its retries, pages and batches) runs past its deadline
+
+    progress holds information on the work completed before the deadline (e.g. number of pages or
+    rows) and partial the results gathered so far, when available.
+    """
+
+    def __init__(self, seconds, progress=None, partial=None):
+        self.seconds = seconds
+        self.progress = progress or {}
+        self.partial = partial
+        super().__init__("Deadline of {0}s exceeded".format(seconds))
+
+
+class BudgetExceeded(Exception):
+    """Raised without sending the request when a call would exceed a usage budget (see UsageLedger)
+
+    budget is 'soft' (refusing low priority calls) or 'hard', limit its number of calls per month and
+    used the calls of the month so far.
+    """
+
+    def __init__(self, budget, limit, used, endpoint=None):
+        self.budget = budget
+        self.limit = limit
+        self.used = used
+        self.endpoint = endpoint
+        super().__init__("{0} budget of {1} calls per month exceeded ({2} used)".format(
+            budget.capitalize(), limit, used))
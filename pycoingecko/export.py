@@ -0,0 +1,242 @@
+import json
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+
+from .exceptions import DeadlineExceeded
+from .paging import iter_pages
+from .timeouts import deadline as call_deadline
+from .utils import get_path
+
+# (column name, arrow type name, dotted path in the api record)
+COINS_MARKETS_FIELDS = [
+    ('id', 'string', 'id'),
+    ('symbol', 'string', 'symbol'),
+    ('name', 'string', 'name'),
+    ('current_price', 'float64', 'current_price'),
+    ('market_cap', 'float64', 'market_cap'),
+    ('market_cap_rank', 'int64', 'market_cap_rank'),
+    ('fully_diluted_valuation', 'float64', 'fully_diluted_valuation'),
+    ('total_volume', 'float64', 'total_volume'),
+    ('high_24h', 'float64', 'high_24h'),
+    ('low_24h', 'float64', 'low_24h'),
+    ('price_change_24h', 'float64', 'price_change_24h'),
+    ('price_change_percentage_24h', 'float64', 'price_change_percentage_24h'),
+    ('market_cap_change_24h', 'float64', 'market_cap_change_24h'),
+    ('market_cap_change_percentage_24h', 'float64', 'market_cap_change_percentage_24h'),
+    ('circulating_supply', 'float64', 'circulating_supply'),
+    ('total_supply', 'float64', 'total_supply'),
+    ('max_supply', 'float64', 'max_supply'),
+    ('ath', 'float64', 'ath'),
+    ('ath_change_percentage', 'float64', 'ath_change_percentage'),
+    ('ath_date', 'string', 'ath_date'),
+    ('atl', 'float64', 'atl'),
+    ('atl_change_percentage', 'float64', 'atl_change_percentage'),
+    ('atl_date', 'string', 'atl_date'),
+    ('last_updated', 'string', 'last_updated'),
+]
+
+EXCHANGES_FIELDS = [
+    ('id', 'string', 'id'),
+    ('name', 'string', 'name'),
+    ('year_established', 'int64', 'year_established'),
+    ('country', 'string', 'country'),
+    ('url', 'string', 'url'),
+    ('has_trading_incentive', 'bool', 'has_trading_incentive'),
+    ('trust_score', 'int64', 'trust_score'),
+    ('trust_score_rank', 'int64', 'trust_score_rank'),
+    ('trade_volume_24h_btc', 'float64', 'trade_volume_24h_btc'),
+    ('trade_volume_24h_btc_normalized', 'float64', 'trade_volume_24h_btc_normalized'),
+]
+
+DERIVATIVES_FIELDS = [
+    ('market', 'string', 'market'),
+    ('symbol', 'string', 'symbol'),
+    ('index_id', 'string', 'index_id'),
+    ('price', 'float64', 'price'),
+    ('price_percentage_change_24h', 'float64', 'price_percentage_change_24h'),
+    ('contract_type', 'string', 'contract_type'),
+    ('index', 'float64', 'index'),
+    ('basis', 'float64', 'basis'),
+    ('spread', 'float64', 'spread'),
+    ('funding_rate', 'float64', 'funding_rate'),
+    ('open_interest', 'float64', 'open_interest'),
+    ('volume_24h', 'float64', 'volume_24h'),
+    ('last_traded_at', 'int64', 'last_traded_at'),
+    ('expired_at', 'int64', 'expired_at'),
+]
+
+NFTS_MARKETS_FIELDS = [
+    ('id', 'string', 'id'),
+    ('contract_address', 'string', 'contract_address'),
+    ('asset_platform_id', 'string', 'asset_platform_id'),
+    ('name', 'string', 'name'),
+    ('symbol', 'string', 'symbol'),
+    ('floor_price_native', 'float64', 'floor_price.native_currency'),
+    ('floor_price_usd', 'float64', 'floor_price.usd'),
+    ('market_cap_native', 'float64', 'market_cap.native_currency'),
+    ('market_cap_usd', 'float64', 'market_cap.usd'),
+    ('volume_24h_native', 'float64', 'volume_24h.native_currency'),
+    ('volume_24h_usd', 'float64', 'volume_24h.usd'),
+    ('floor_price_in_usd_24h_percentage_change', 'float64', 'floor_price_in_usd_24h_percentage_change'),
+    ('number_of_unique_addresses', 'int64', 'number_of_unique_addresses'),
+    ('total_supply', 'float64', 'total_supply'),
+]
+
+# dataset name -> (client method name, fields, page size or None if not paginated)
+DATASETS = {
+    'coins_markets': ('get_coins_markets', COINS_MARKETS_FIELDS, 250),
+    'exchanges': ('get_exchanges_list', EXCHANGES_FIELDS, 250),
+    'derivatives': ('get_derivatives', DERIVATIVES_FIELDS, None),
+    'nfts_markets': ('get_nfts_markets', NFTS_MARKETS_FIELDS, 250),
+}
+
+FORMATS = ('parquet', 'arrow')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("pyarrow is required for exporting snapshots (pip install pyarrow)")
+
+
+def _convert(value, type_name):
+    """Coerce an api value to the python type of the column (None if not convertible)"""
+
+    if value is None:
+        return None
+    try:
+        if type_name == 'float64':
+            return float(value)
+        if type_name == 'int64':
+            return int(value)
+        if type_name == 'bool':
+            return bool(value)
+        return str(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_schema(dataset):
+    """Return the (stable) arrow schema of a dataset"""
+
+    _require_pyarrow()
+    fields = DATASETS[dataset][1]
+    return pa.schema([(name, getattr(pa, type_name)()) for name, type_name, _ in fields])
+
+
+def records_to_batch(records, dataset):
+    """Convert a list of api records to an arrow record batch with the dataset schema"""
+
+    schema = get_schema(dataset)
+    fields = DATASETS[dataset][1]
+    columns = []
+    for (name, type_name, path), field in zip(fields, schema):
+        values = [_convert(get_path(record, path), type_name) for record in records]
+        columns.append(pa.array(values, type=field.type))
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
+
+def iter_dataset_pages(cg, dataset, max_workers=4, limiter=None, **kwargs):
+    """Yield the pages (lists of records) of a dataset, fetching pages concurrently"""
+
+    method_name, _, per_page = DATASETS[dataset]
+    method = getattr(cg, method_name)
+
+    if per_page is None:
+        yield method(**kwargs)
+        return
+
+    def fetch_page(page):
+        return method(per_page=per_page, page=page, **kwargs)
+
+    for items in iter_pages(fetch_page, per_page, max_workers=max_workers, limiter=limiter):
+        if items:
+            yield items
+
+
+def page_to_ipc(raw, dataset):
+    """Decoder transform converting the raw content of a dataset page to an arrow ipc stream buffer"""
+
+    batch = records_to_batch(json.loads(raw), dataset)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def ipc_to_batch(buffer):
+    """Return the record batch of an ipc stream buffer written by page_to_ipc"""
+
+    return pa.ipc.open_stream(buffer).read_next_batch()
+
+
+def iter_dataset_batches(cg, dataset, max_workers=4, decoder=None, limiter=None, **kwargs):
+    """Yield arrow record batches of a dataset, one per fetched page
+
+    With a decoder (ProcessPoolDecoder), pages are fetched undecoded and converted to record batches in
+    its process pool. With a limiter (AdaptiveConcurrencyLimiter), its window bounds the concurrent
+    pages instead of max_workers.
+    """
+
+    _require_pyarrow()
+    if decoder is None:
+        for records in iter_dataset_pages(cg, dataset, max_workers=max_workers, limiter=limiter, **kwargs):
+            yield records_to_batch(records, dataset)
+        return
+
+    method_name, _, per_page = DATASETS[dataset]
+    method = getattr(cg, method_name)
+
+    if per_page is None:
+        yield ipc_to_batch(decoder.run(page_to_ipc, method(raw=True, **kwargs), dataset))
+        return
+
+    def fetch_page(page):
+        raw = method(per_page=per_page, page=page, raw=True, **kwargs)
+        return ipc_to_batch(decoder.run(page_to_ipc, raw, dataset))
+
+    for batch in iter_pages(fetch_page, per_page, max_workers=max_workers, limiter=limiter):
+        if batch.num_rows:
+            yield batch
+
+
+def export_snapshot(cg, dataset, path, format='parquet', max_workers=4, deadline=None, decoder=None, limiter=None,
+                    **kwargs):
+    """Write a dataset snapshot to a parquet or arrow ipc file, batch by batch
+
+    Any extra keyword arguments are passed to the client method (e.g. vs_currency for coins_markets).
+    Pages are converted in the process pool of decoder if given and fetched within the window of limiter
+    if given (see iter_dataset_batches).
+    If the export runs past deadline seconds, DeadlineExceeded is raised (its progress holding the
+    number of rows written so far). Return the number of exported rows.
+    """
+
+    _require_pyarrow()
+    if dataset not in DATASETS:
+        raise ValueError("Unknown dataset '{0}' (expected one of {1})".format(dataset, ', '.join(DATASETS)))
+    if format not in FORMATS:
+        raise ValueError("Unknown format '{0}' (expected one of {1})".format(format, ', '.join(FORMATS)))
+
+    schema = get_schema(dataset)
+    if format == 'parquet':
+        writer = pa.parquet.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+
+    rows = 0
+    try:
+        with call_deadline(deadline):
+            for batch in iter_dataset_batches(cg, dataset, max_workers=max_workers, decoder=decoder,
+                                              limiter=limiter, **kwargs):
+                writer.write_batch(batch)
+                rows += batch.num_rows
+    except DeadlineExceeded as e:
+        e.progress['rows'] = rows
+        raise
+    finally:
+        writer.close()
+    return rows
@@ -0,0 +1,207 @@
+"""Follow the new listings endpoints (new onchain pools, new coins) and report only unseen entries"""
+
+import asyncio
+import datetime
+import threading
+import time
+from collections import OrderedDict
+
+# feed name -> (client method, paginated)
+FEEDS = {
+    'coins_list_new': ('get_coins_list_new', False),
+    'onchain_new_pools': ('get_onchain_new_pools', True),
+    'onchain_all_new_pools': ('get_onchain_all_new_pools', True),
+}
+
+
+class SeenSet:
+    """Set of keys remembered for ttl seconds, holding at most max_items keys (oldest evicted first)"""
+
+    def __init__(self, ttl=7 * 86400, max_items=100000):
+        self.ttl = ttl
+        self.max_items = max_items
+        # key -> time added, in insertion order
+        self._keys = OrderedDict()
+
+    def _expire(self, now):
+        while self._keys and (len(self._keys) > self.max_items or now - next(iter(self._keys.values())) > self.ttl):
+            self._keys.popitem(last=False)
+
+    def add(self, key):
+        now = time.monotonic()
+        self._keys.pop(key, None)
+        self._keys[key] = now
+        self._expire(now)
+
+    def __contains__(self, key):
+        self._expire(time.monotonic())
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+
+def item_key(item):
+    """Return the key of a feed item (coin id, or JSON:API resource id of a pool)"""
+
+    return item.get('id')
+
+
+def item_created_at(item):
+    """Return the creation time of a feed item as a unix timestamp (None if unknown)"""
+
+    if item.get('activated_at') is not None:
+        return float(item['activated_at'])
+    created_at = (item.get('attributes') or {}).get('pool_created_at')
+    if not created_at:
+        return None
+    return datetime.datetime.fromisoformat(created_at.replace('Z', '+00:00')).timestamp()
+
+
+def _items(response):
+    if isinstance(response, dict):
+        return response.get('data') or []
+    return response or []
+
+
+class Follower:
+    """Poll a new listings feed and return the entries not seen before
+
+    feed is one of FEEDS (onchain_new_pools needs the network argument). Paginated feeds are paged
+    only until a page holding an already seen entry (or max_pages). Seen entries are remembered in a
+    bounded SeenSet. The first poll only records the current entries unless include_existing is set.
+    stats holds the number of polls, requests and new entries, the requests spent per new entry and the
+    detection latency (seconds between the creation of an entry and its detection).
+    """
+
+    def __init__(self, cg, feed, network=None, interval=60, max_pages=10, seen=None, include_existing=False,
+                 **kwargs):
+        if feed not in FEEDS:
+            raise ValueError("Unknown feed '{0}' (expected one of {1})".format(feed, ', '.join(FEEDS)))
+        if feed == 'onchain_new_pools' and network is None:
+            raise ValueError("The onchain_new_pools feed needs a network")
+        method_name, self.paginated = FEEDS[feed]
+        method = getattr(cg, method_name)
+        if network is not None:
+            self._fetch = lambda **params: method(network, **params)
+        else:
+            self._fetch = method
+        self.feed = feed
+        self.interval = interval
+        self.max_pages = max_pages
+        self.seen = seen if seen is not None else SeenSet()
+        self.kwargs = kwargs
+        self._primed = include_existing
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.polls = 0
+        self.requests = 0
+        self.new_items = 0
+        self._latency_sum = 0.0
+        self._latency_count = 0
+        self._latency_max = None
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {
+                'polls': self.polls,
+                'requests': self.requests,
+                'new_items': self.new_items,
+                'requests_per_item': self.requests / self.new_items if self.new_items else None,
+                'latency_mean': self._latency_sum / self._latency_count if self._latency_count else None,
+                'latency_max': self._latency_max,
+            }
+
+    def _fetch_new(self):
+        """Return the unseen items of the feed (newest first) and the number of requests sent"""
+
+        new = []
+        requests = 0
+        page = 1
+        while True:
+            if self.paginated:
+                items = _items(self._fetch(page=page, **self.kwargs))
+            else:
+                items = _items(self._fetch(**self.kwargs))
+            requests += 1
+            reached_seen = False
+            for item in items:
+                if item_key(item) in self.seen:
+                    reached_seen = True
+                else:
+                    new.append(item)
+            # the priming poll only needs the first page
+            if not self.paginated or reached_seen or not items or not self._primed or page >= self.max_pages:
+                return new, requests
+            page += 1
+
+    def poll(self):
+        """Fetch the feed and return its new entries, oldest first"""
+
+        new, requests = self._fetch_new()
+        now = time.time()
+        unique = OrderedDict((item_key(item), item) for item in reversed(new))
+        for key in unique:
+            self.seen.add(key)
+
+        with self._lock:
+            self.polls += 1
+            self.requests += requests
+            if not self._primed:
+                self._primed = True
+                return []
+            self.new_items += len(unique)
+            for item in unique.values():
+                created_at = item_created_at(item)
+                if created_at is not None:
+                    latency = max(0.0, now - created_at)
+                    self._latency_sum += latency
+                    self._latency_count += 1
+                    self._latency_max = latency if self._latency_max is None else max(self._latency_max, latency)
+        return list(unique.values())
+
+    def start(self, callback):
+        """Start polling in a background thread every interval seconds, calling callback(item) for new entries"""
+
+        if self._thread is not None and self._thread.is_alive():
+            return self
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(callback,), name='pycoingecko-follow', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the background polling thread"""
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, callback):
+        while not self._stop.is_set():
+            try:
+                items = self.poll()
+            except Exception:
+                # try again on next interval
+                items = []
+            for item in items:
+                callback(item)
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    async def __aiter__(self):
+        """Yield new entries forever, polling every interval seconds (polls run in the default executor)"""
+
+        loop = asyncio.get_running_loop()
+        while True:
+            for item in await loop.run_in_executor(None, self.poll):
+                yield item
+            await asyncio.sleep(self.interval)
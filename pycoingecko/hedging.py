@@ -0,0 +1,145 @@
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from .timeouts import submit
+from .utils import get_endpoint_template
+
+# endpoints hedged by default: /simple/price and /onchain/simple/networks/{network}/token_price
+DEFAULT_HEDGED_ENDPOINTS = ('simple/price', 'onchain/simple/')
+
+
+class LatencyTracker:
+    """Keep the last latencies of every endpoint to estimate their percentiles"""
+
+    def __init__(self, window=200):
+        self.window = window
+        self._lock = threading.Lock()
+        self._latencies = {}
+
+    def record(self, endpoint, latency):
+        with self._lock:
+            self._latencies.setdefault(endpoint, deque(maxlen=self.window)).append(latency)
+
+    def count(self, endpoint):
+        with self._lock:
+            return len(self._latencies.get(endpoint, ()))
+
+    def percentile(self, endpoint, q):
+        """Return the q-th percentile of the latencies of an endpoint (None without samples)"""
+
+        with self._lock:
+            latencies = sorted(self._latencies.get(endpoint, ()))
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(q / 100.0 * (len(latencies) - 1))))
+        return latencies[index]
+
+
+class HedgePolicy:
+    """Send a duplicate of slow requests on latency-critical endpoints and keep the first response
+
+    A hedge is sent when the request has not completed delay seconds after it was sent (time spent
+    waiting for a worker does not count); by default the delay is the observed percentile latency of the
+    endpoint template (e.g. 'onchain/simple/networks/*/token_price/*'), default_delay until min_samples
+    latencies are known.
+    At most max_hedge_ratio of the requests get a hedge, bounding the extra quota spent. The losing
+    request cannot be interrupted once sent: its response is discarded and its connection released
+    when it completes. Requests run in a thread pool and share the client transport (and its session
+    connection pool). Copies and pickles keep the settings only.
+    """
+
+    def __init__(self, endpoints=DEFAULT_HEDGED_ENDPOINTS, delay=None, percentile=95, default_delay=1.0,
+                 min_samples=20, max_hedge_ratio=0.1, max_workers=8):
+        self.endpoints = tuple(endpoints)
+        self.delay = delay
+        self.percentile = percentile
+        self.default_delay = default_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+        self.max_workers = max_workers
+        self.latencies = LatencyTracker()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pycoingecko-hedge')
+        self.requests = 0
+        self.hedges_fired = 0
+        self.hedges_won = 0
+
+    @property
+    def stats(self):
+        with self._lock:
+            return {'requests': self.requests, 'hedges_fired': self.hedges_fired, 'hedges_won': self.hedges_won}
+
+    def applies(self, endpoint):
+        return endpoint.startswith(self.endpoints)
+
+    def hedge_delay(self, endpoint):
+        if self.delay is not None:
+            return self.delay
+        key = get_endpoint_template(endpoint)
+        if self.latencies.count(key) < self.min_samples:
+            return self.default_delay
+        return self.latencies.percentile(key, self.percentile)
+
+    def _timed(self, endpoint, send, started=None):
+        start = time.monotonic()
+        if started is not None:
+            started.put(start)
+        response = send()
+        self.latencies.record(get_endpoint_template(endpoint), time.monotonic() - start)
+        return response
+
+    def _reserve_hedge(self):
+        with self._lock:
+            if self.hedges_fired + 1 > self.max_hedge_ratio * self.requests:
+                return False
+            self.hedges_fired += 1
+            return True
+
+    def send(self, endpoint, send):
+        """Return the response of send(), hedging it with a second send() if it is slow"""
+
+        with self._lock:
+            self.requests += 1
+
+        started = queue.Queue(maxsize=1)
+        primary = submit(self._executor, self._timed, endpoint, send, started)
+        # the delay runs from the start of the send: no hedge is reserved while the primary waits for a worker
+        start = started.get()
+        timeout = max(0.0, self.hedge_delay(endpoint) - (time.monotonic() - start))
+        done, _ = wait([primary], timeout=timeout)
+        if done or not self._reserve_hedge():
+            return primary.result()
+
+        hedge = submit(self._executor, self._timed, endpoint, send)
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                if future is hedge:
+                    with self._lock:
+                        self.hedges_won += 1
+                for other in pending:
+                    if not other.cancel():
+                        other.add_done_callback(_close_response)
+                return future.result()
+        raise error
+
+    def __getstate__(self):
+        return {'endpoints': self.endpoints, 'delay': self.delay, 'percentile': self.percentile,
+                'default_delay': self.default_delay, 'min_samples': self.min_samples,
+                'max_hedge_ratio': self.max_hedge_ratio, 'max_workers': self.max_workers}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+def _close_response(future):
+    if future.exception() is None and hasattr(future.result(), 'close'):
+        future.result().close()
@@ -0,0 +1,138 @@
+import datetime
+import json
+import sqlite3
+import threading
+
+from .paging import map_concurrent
+from .ratelimit import RateLimiter
+
+# date format of /coins/{id}/history
+DATE_FORMAT = '%d-%m-%Y'
+
+
+class HistoryCache:
+    """Permanent sqlite cache of /coins/{id}/history responses
+
+    Snapshots of past dates never change, so they are kept forever; the cache also acts as the
+    checkpoint of interrupted backfills.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS history '
+                                     '(id TEXT NOT NULL, date TEXT NOT NULL, payload TEXT NOT NULL, '
+                                     'PRIMARY KEY (id, date))')
+
+    def get(self, id, date):
+        with self._lock:
+            row = self._connection.execute('SELECT payload FROM history WHERE id = ? AND date = ?',
+                                           (id, _iso(date))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def get_many(self, ids, start=None, end=None):
+        """Return {(id, iso date): payload} of the cached snapshots of ids, from start to end if given"""
+
+        query = 'SELECT date, payload FROM history WHERE id = ?'
+        bounds = ()
+        if start is not None or end is not None:
+            # iso dates compare as strings
+            query += ' AND date BETWEEN ? AND ?'
+            bounds = (_iso(start) if start is not None else '', _iso(end) if end is not None else '9999-12-31')
+        result = {}
+        with self._lock:
+            for id in ids:
+                for date, payload in self._connection.execute(query, (id,) + bounds):
+                    result[(id, date)] = payload
+        return result
+
+    def put(self, id, date, payload):
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO history (id, date, payload) VALUES (?, ?, ?)',
+                                     (id, _iso(date), json.dumps(payload, separators=(',', ':'))))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM history').fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+
+def _to_date(value):
+    if isinstance(value, datetime.datetime):
+        return value.date()
+    if isinstance(value, datetime.date):
+        return value
+    return datetime.date.fromisoformat(value)
+
+
+def _iso(date):
+    return _to_date(date).isoformat()
+
+
+def date_range(start, end):
+    """Return the dates from start to end (included); dates are datetime.date or 'YYYY-MM-DD' strings"""
+
+    start, end = _to_date(start), _to_date(end)
+    return [start + datetime.timedelta(days=i) for i in range((end - start).days + 1)]
+
+
+def _value(payload, field, vs_currency):
+    return (((payload or {}).get('market_data') or {}).get(field) or {}).get(vs_currency)
+
+
+def get_coins_history_range(cg, ids, start, end, vs_currency='usd', cache=None, max_workers=4, rate=None,
+                            limiter=None, **kwargs):
+    """Fetch the daily /coins/{id}/history snapshots of ids for every date from start to end
+
+    Calls run concurrently (max_workers, or the window of limiter, an AdaptiveConcurrencyLimiter) and, if
+    rate is given, at most rate calls per minute. Snapshots
+    of past dates are stored in cache (a HistoryCache, or the path of its sqlite file) as soon as they
+    arrive and never fetched again, so re-running an interrupted backfill only fetches what is missing.
+    Return columns {'id', 'date', 'price', 'market_cap', 'total_volume'} (lists, sorted by id and date)
+    with the values in vs_currency (None when the coin has no data for a date).
+    """
+
+    own_cache = cache is None or isinstance(cache, str)
+    if own_cache:
+        cache = HistoryCache(cache or ':memory:')
+    try:
+        kwargs.setdefault('localization', False)
+        ids = list(ids)
+        dates = date_range(start, end)
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+
+        cached = {key: json.loads(payload) for key, payload in cache.get_many(ids, start, end).items()}
+        missing = [(id, date) for id in ids for date in dates if (id, date.isoformat()) not in cached]
+        rate_limiter = RateLimiter(rate) if rate else None
+
+        def fetch(task):
+            id, date = task
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+            payload = cg.get_coin_history_by_id(id, date.strftime(DATE_FORMAT), **kwargs)
+            if date < today:
+                cache.put(id, date, payload)
+            return payload
+
+        payloads = map_concurrent(fetch, missing, max_workers=max_workers, limiter=limiter)
+        for (id, date), payload in zip(missing, payloads):
+            cached[(id, date.isoformat())] = payload
+
+        columns = {'id': [], 'date': [], 'price': [], 'market_cap': [], 'total_volume': []}
+        for id in ids:
+            for date in dates:
+                payload = cached[(id, date.isoformat())]
+                columns['id'].append(id)
+                columns['date'].append(date)
+                columns['price'].append(_value(payload, 'current_price', vs_currency))
+                columns['market_cap'].append(_value(payload, 'market_cap', vs_currency))
+                columns['total_volume'].append(_value(payload, 'total_volume', vs_currency))
+        return columns
+    finally:
+        if own_cache:
+            # the cache was opened here
+            cache.close()
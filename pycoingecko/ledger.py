@@ -0,0 +1,163 @@
+"""Usage ledger: calls per endpoint and tag, monthly burn projection and budgets"""
+
+import calendar
+import contextlib
+import contextvars
+import datetime
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+from .exceptions import BudgetExceeded
+from .timeouts import current_deadline
+
+PRIORITIES = ('low', 'normal', 'high')
+
+# (tag, priority) of the calls made in the current context
+_usage = contextvars.ContextVar('pycoingecko_usage', default=(None, 'normal'))
+
+
+@contextlib.contextmanager
+def usage_tag(tag=None, priority='normal'):
+    """Context manager tagging the calls made in it (e.g. with a service or job name) and setting their priority
+
+    Low priority calls are refused (or throttled) past the soft budget of the ledger.
+    """
+
+    if priority not in PRIORITIES:
+        raise ValueError("Unknown priority '{0}' (expected one of {1})".format(priority, ', '.join(PRIORITIES)))
+    token = _usage.set((tag, priority))
+    try:
+        yield
+    finally:
+        _usage.reset(token)
+
+
+def _month(now=None):
+    return (now or datetime.datetime.now(datetime.timezone.utc)).strftime('%Y-%m')
+
+
+class UsageLedger:
+    """Count the calls sent per month, endpoint (client method) and tag (see usage_tag)
+
+    Calls are counted in memory and added to the sqlite file at path every flush_interval seconds (and on
+    flush/close), so several processes can share a ledger file. Past soft_budget calls in the month, low
+    priority calls are refused with BudgetExceeded, or delayed by soft_throttle seconds if given; past
+    hard_budget calls, every call is refused. Retries sent by the transport itself are not counted.
+    Copies and pickles keep the settings only (and open the file again).
+    """
+
+    def __init__(self, path=':memory:', soft_budget=None, hard_budget=None, soft_throttle=None, flush_interval=10):
+        self.path = path
+        self.soft_budget = soft_budget
+        self.hard_budget = hard_budget
+        self.soft_throttle = soft_throttle
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS usage '
+                                     '(month TEXT NOT NULL, endpoint TEXT NOT NULL, tag TEXT NOT NULL, '
+                                     'calls INTEGER NOT NULL, PRIMARY KEY (month, endpoint, tag))')
+        # (month, endpoint, tag) -> calls not flushed yet
+        self._pending = Counter()
+        self._flushed_at = time.monotonic()
+        self._current_month = _month()
+        self._month_calls = self._stored_total(self._current_month)
+
+    def _stored_total(self, month):
+        row = self._connection.execute('SELECT SUM(calls) FROM usage WHERE month = ?', (month,)).fetchone()
+        return row[0] or 0
+
+    @property
+    def month_calls(self):
+        """Calls of the current month (including the ones counted by other processes at the last flush)"""
+
+        with self._lock:
+            self._roll_month()
+            return self._month_calls
+
+    def _roll_month(self):
+        month = _month()
+        if month != self._current_month:
+            self._current_month = month
+            self._month_calls = sum(calls for key, calls in self._pending.items() if key[0] == month)
+
+    def check(self, endpoint=None):
+        """Raise BudgetExceeded if a call with the priority of the current context must not be sent"""
+
+        _, priority = _usage.get()
+        with self._lock:
+            self._roll_month()
+            used = self._month_calls
+        if self.hard_budget is not None and used >= self.hard_budget:
+            raise BudgetExceeded('hard', self.hard_budget, used, endpoint)
+        if self.soft_budget is not None and used >= self.soft_budget and priority == 'low':
+            if self.soft_throttle is None:
+                raise BudgetExceeded('soft', self.soft_budget, used, endpoint)
+            # the sleep never outlasts the deadline of the call
+            current = current_deadline()
+            time.sleep(self.soft_throttle if current is None else min(self.soft_throttle, current.remaining()))
+
+    def record(self, endpoint):
+        """Count a call to endpoint with the tag of the current context"""
+
+        tag, _ = _usage.get()
+        with self._lock:
+            self._roll_month()
+            self._pending[(self._current_month, endpoint, tag or '')] += 1
+            self._month_calls += 1
+            flush = time.monotonic() - self._flushed_at >= self.flush_interval
+        if flush:
+            self.flush()
+
+    def flush(self):
+        """Add the pending counts to the ledger file"""
+
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+            self._flushed_at = time.monotonic()
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT INTO usage (month, endpoint, tag, calls) VALUES (?, ?, ?, ?) '
+                    'ON CONFLICT (month, endpoint, tag) DO UPDATE SET calls = calls + excluded.calls',
+                    [key + (calls,) for key, calls in pending.items()])
+            # pick up the calls counted by other processes sharing the file
+            self._month_calls = self._stored_total(self._current_month)
+
+    def usage(self, month=None):
+        """Return {(endpoint, tag): calls} of a month ('YYYY-MM', the current one by default)"""
+
+        month = month or _month()
+        self.flush()
+        with self._lock:
+            rows = self._connection.execute('SELECT endpoint, tag, calls FROM usage WHERE month = ?', (month,))
+            return {(endpoint, tag or None): calls for endpoint, tag, calls in rows}
+
+    def projected_monthly(self, now=None):
+        """Return the calls of the current month projected to its end at the current burn rate"""
+
+        now = now or datetime.datetime.now(datetime.timezone.utc)
+        days = calendar.monthrange(now.year, now.month)[1]
+        start = now.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+        elapsed = (now - start).total_seconds() / (days * 86400)
+        used = sum(self.usage(_month(now)).values())
+        return used / elapsed if elapsed else float(used)
+
+    def close(self):
+        self.flush()
+        self._connection.close()
+
+    def __getstate__(self):
+        return {'path': self.path, 'soft_budget': self.soft_budget, 'hard_budget': self.hard_budget,
+                'soft_throttle': self.soft_throttle, 'flush_interval': self.flush_interval}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
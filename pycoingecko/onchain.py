@@ -0,0 +1,91 @@
+from .exceptions import DeadlineExceeded
+from .paging import map_concurrent
+from .timeouts import deadline as call_deadline
+
+# maximum number of addresses per call accepted by the api
+MAX_MULTI_POOLS_ADDRESSES = 30
+MAX_TOKEN_PRICE_ADDRESSES = 30
+
+
+def group_by_network(addresses):
+    """Return {network: [addresses]} (deduplicated, order kept)
+
+    addresses is either a {network: [addresses]} dict or an iterable of (network, address) pairs.
+    """
+
+    if isinstance(addresses, dict):
+        addresses = ((network, address) for network, values in addresses.items() for address in values)
+
+    grouped = {}
+    for network, address in addresses:
+        grouped.setdefault(network, {})[address] = None
+    return {network: list(values) for network, values in grouped.items()}
+
+
+def chunked(items, size):
+    """Return items split in lists of at most size items"""
+
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+
+def _network_chunks(addresses, chunk_size):
+    return [(network, chunk)
+            for network, values in group_by_network(addresses).items()
+            for chunk in chunked(values, chunk_size)]
+
+
+def get_onchain_pools_batched(cg, pool_addresses, chunk_size=MAX_MULTI_POOLS_ADDRESSES, max_workers=4,
+                              deadline=None, limiter=None, **kwargs):
+    """Fetch any number of pools across networks with concurrent /pools/multi calls
+
+    Return the merged JSON:API payloads as {'data': {id: pool}, 'included': {id: resource}}, indexed by
+    the resource ids (e.g. 'eth_0x...'); included resources shared by several chunks appear once.
+    If the calls run past deadline seconds, the DeadlineExceeded raised holds the chunks merged so far
+    in partial. With a limiter (AdaptiveConcurrencyLimiter), its window bounds the concurrent calls
+    instead of max_workers.
+    """
+
+    def fetch(task):
+        network, chunk = task
+        return cg.get_onchain_multi_pools(network, chunk, **kwargs)
+
+    merged = {'data': {}, 'included': {}}
+    try:
+        with call_deadline(deadline):
+            for response in map_concurrent(fetch, _network_chunks(pool_addresses, chunk_size),
+                                           max_workers=max_workers, limiter=limiter):
+                for key in ('data', 'included'):
+                    for resource in response.get(key) or []:
+                        merged[key][resource['id']] = resource
+    except DeadlineExceeded as e:
+        e.partial = merged
+        raise
+    return merged
+
+
+def get_onchain_token_prices_batched(cg, token_addresses, chunk_size=MAX_TOKEN_PRICE_ADDRESSES, max_workers=4,
+                                     deadline=None, limiter=None, **kwargs):
+    """Fetch the price of any number of tokens across networks with concurrent token_price calls
+
+    Return {network: {token_address: price}}. If the calls run past deadline seconds, the
+    DeadlineExceeded raised holds the prices gathered so far in partial. With a limiter
+    (AdaptiveConcurrencyLimiter), its window bounds the concurrent calls instead of max_workers.
+    """
+
+    tasks = _network_chunks(token_addresses, chunk_size)
+
+    def fetch(task):
+        network, chunk = task
+        return cg.get_onchain_token_price(network, chunk, **kwargs)
+
+    prices = {}
+    try:
+        with call_deadline(deadline):
+            responses = map_concurrent(fetch, tasks, max_workers=max_workers, limiter=limiter)
+            for (network, _), response in zip(tasks, responses):
+                attributes = (response.get('data') or {}).get('attributes') or {}
+                prices.setdefault(network, {}).update(attributes.get('token_prices') or {})
+    except DeadlineExceeded as e:
+        e.partial = prices
+        raise
+    return prices
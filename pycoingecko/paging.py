@@ -0,0 +1,85 @@
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import DeadlineExceeded
+from .timeouts import submit
+
+
+def iter_pages(fetch_page, per_page, max_workers=4, start=1, max_pages=None, count=len, limiter=None):
+    """Yield pages in order while fetching up to max_workers pages concurrently
+
+    fetch_page(page) must return the items of that page, count(items) their number (len by default).
+    Paging stops after the first page holding fewer than per_page items (or after max_pages pages).
+    Pages are fetched with the timeouts and deadline of the calling context; a DeadlineExceeded gets
+    the number of pages yielded in its progress.
+    With a limiter (AdaptiveConcurrencyLimiter), up to limiter.window pages are fetched concurrently
+    instead of max_workers. The first page is fetched alone and the window grows by one page with
+    every full page, so that short listings do not fetch pages past their end.
+    """
+
+    last_page = start + max_pages - 1 if max_pages else None
+    if limiter is not None:
+        max_workers = limiter.max_window
+        fetch_page = functools.partial(limiter.call, fetch_page)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = {}
+        next_page = start
+        current = start
+        # most pages in flight: the first page alone, one more after every full page
+        width = 1
+        try:
+            while True:
+                # keep the window of in-flight pages full
+                window = min(width, limiter.window if limiter is not None else max_workers)
+                while len(pending) < window and (last_page is None or next_page <= last_page):
+                    pending[next_page] = submit(executor, fetch_page, next_page)
+                    next_page += 1
+                if current not in pending:
+                    return
+
+                try:
+                    items = pending.pop(current).result()
+                except DeadlineExceeded as e:
+                    e.progress['pages'] = current - start
+                    raise
+                yield items
+
+                if count(items) < per_page:
+                    return
+                current += 1
+                width += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
+
+
+def map_concurrent(func, items, max_workers=4, limiter=None):
+    """Yield func(item) for each item in input order, running up to max_workers calls concurrently
+
+    Calls run with the timeouts and deadline of the calling context; a DeadlineExceeded gets the
+    number of completed and total items in its progress. With a limiter (AdaptiveConcurrencyLimiter),
+    up to limiter.window calls run concurrently instead of max_workers.
+    """
+
+    items = list(items)
+    if not items:
+        return
+
+    if limiter is not None:
+        max_workers = limiter.max_window
+        func = functools.partial(limiter.call, func)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [submit(executor, func, item) for item in items]
+        try:
+            for completed, future in enumerate(futures):
+                try:
+                    result = future.result()
+                except DeadlineExceeded as e:
+                    e.progress.update(completed=completed, total=len(items))
+                    raise
+                yield result
+        finally:
+            for future in futures:
+                future.cancel()
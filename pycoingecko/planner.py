@@ -0,0 +1,168 @@
+"""Plan the cheapest combination of bulk endpoints returning given fields of given coins
+
+Fields are named after the /coins/markets records (current_price, market_cap, total_volume, ...); any
+other field is a dotted path in the /coins/{id} payload (e.g. 'categories', 'links.homepage').
+"""
+
+from .onchain import chunked
+from .paging import map_concurrent
+from .utils import get_path
+
+# coins per /coins/markets page and per /simple/price call
+BULK_CHUNK_SIZE = 250
+
+# /simple/price: field -> (key in the coin prices, include flag)
+PRICE_FIELDS = {
+    'current_price': ('{vs}', None),
+    'market_cap': ('{vs}_market_cap', 'include_market_cap'),
+    'total_volume': ('{vs}_24h_vol', 'include_24hr_vol'),
+    'price_change_percentage_24h': ('{vs}_24h_change', 'include_24hr_change'),
+}
+
+MARKETS_FIELDS = frozenset([
+    'symbol', 'name', 'image', 'current_price', 'market_cap', 'market_cap_rank', 'fully_diluted_valuation',
+    'total_volume', 'high_24h', 'low_24h', 'price_change_24h', 'price_change_percentage_24h', 'market_cap_change_24h',
+    'market_cap_change_percentage_24h', 'circulating_supply', 'total_supply', 'max_supply', 'ath',
+    'ath_change_percentage', 'ath_date', 'atl', 'atl_change_percentage', 'atl_date', 'roi', 'last_updated',
+])
+
+# /coins/{id}: markets field -> dotted path of the same value
+COIN_FIELDS = {
+    'symbol': 'symbol',
+    'name': 'name',
+    'image': 'image.large',
+    'current_price': 'market_data.current_price.{vs}',
+    'market_cap': 'market_data.market_cap.{vs}',
+    'market_cap_rank': 'market_cap_rank',
+    'fully_diluted_valuation': 'market_data.fully_diluted_valuation.{vs}',
+    'total_volume': 'market_data.total_volume.{vs}',
+    'high_24h': 'market_data.high_24h.{vs}',
+    'low_24h': 'market_data.low_24h.{vs}',
+    'price_change_24h': 'market_data.price_change_24h_in_currency.{vs}',
+    'price_change_percentage_24h': 'market_data.price_change_percentage_24h_in_currency.{vs}',
+    'circulating_supply': 'market_data.circulating_supply',
+    'total_supply': 'market_data.total_supply',
+    'max_supply': 'market_data.max_supply',
+    'ath': 'market_data.ath.{vs}',
+    'atl': 'market_data.atl.{vs}',
+    'last_updated': 'last_updated',
+}
+
+# /coins/{id} blocks sent only when a field needs them
+COIN_BLOCKS = ('localization', 'tickers', 'market_data', 'community_data', 'developer_data')
+
+
+class QueryStep:
+    """Calls of one endpoint: method (client method name), ids and fields (name -> key or path read)"""
+
+    def __init__(self, method, ids, fields):
+        self.method = method
+        self.ids = ids
+        self.fields = fields
+
+    @property
+    def requests(self):
+        if self.method == 'get_coin_by_id':
+            return len(self.ids)
+        return -(-len(self.ids) // BULK_CHUNK_SIZE)
+
+    def __repr__(self):
+        return '<QueryStep {0} ids={1} fields={2} requests={3}>'.format(
+            self.method, len(self.ids), sorted(self.fields), self.requests)
+
+
+class QueryPlan:
+    """Steps returning the fields of the coins, and their total number of requests"""
+
+    def __init__(self, ids, fields, vs_currency, steps):
+        self.ids = ids
+        self.fields = fields
+        self.vs_currency = vs_currency
+        self.steps = steps
+
+    @property
+    def requests(self):
+        return sum(step.requests for step in self.steps)
+
+    def __repr__(self):
+        return '<QueryPlan requests={0} steps={1}>'.format(self.requests, self.steps)
+
+
+def plan_query(ids, fields, vs_currency='usd'):
+    """Return the QueryPlan fetching fields of ids in the fewest requests
+
+    Fields of /simple/price are fetched with it (with the include flags they need), other markets fields
+    with /coins/markets?ids=..., and the remaining fields with one /coins/{id} call per coin, which then
+    fetches all the fields when the coin payload has them (the bulk calls would only add requests).
+    """
+
+    ids = list(dict.fromkeys(ids))
+    fields = list(dict.fromkeys(fields))
+    vs = vs_currency.lower()
+    bulk = [field for field in fields if field in MARKETS_FIELDS]
+    per_coin = [field for field in fields if field not in MARKETS_FIELDS]
+
+    steps = []
+    if per_coin and all(field in COIN_FIELDS for field in bulk):
+        paths = {field: COIN_FIELDS[field].format(vs=vs) for field in bulk}
+        paths.update({field: field for field in per_coin})
+        return QueryPlan(ids, fields, vs, [QueryStep('get_coin_by_id', ids, paths)])
+
+    if bulk and all(field in PRICE_FIELDS for field in bulk):
+        keys = {field: PRICE_FIELDS[field][0].format(vs=vs) for field in bulk}
+        steps.append(QueryStep('get_price', ids, keys))
+    elif bulk:
+        steps.append(QueryStep('get_coins_markets', ids, {field: field for field in bulk}))
+    if per_coin:
+        steps.append(QueryStep('get_coin_by_id', ids, {field: field for field in per_coin}))
+    return QueryPlan(ids, fields, vs, steps)
+
+
+def _run_step(cg, step, vs, max_workers, limiter):
+    """Return {id: {field: value}} for a step"""
+
+    if step.method == 'get_coin_by_id':
+        paths = list(step.fields.values())
+        roots = {path.split('.', 1)[0] for path in paths}
+        params = {block: block in roots for block in COIN_BLOCKS}
+
+        def fetch(id):
+            return cg.get_coin_by_id(id, fields=paths, **params)
+
+        payloads = zip(step.ids, map_concurrent(fetch, step.ids, max_workers=max_workers, limiter=limiter))
+        return {id: {field: get_path(payload, path) for field, path in step.fields.items()}
+                for id, payload in payloads}
+
+    if step.method == 'get_price':
+        params = {PRICE_FIELDS[field][1]: True for field in step.fields if PRICE_FIELDS[field][1]}
+
+        def fetch(chunk):
+            return cg.get_price(ids=chunk, vs_currencies=vs, **params)
+    else:
+        def fetch(chunk):
+            records = cg.get_coins_markets(vs, ids=chunk, per_page=BULK_CHUNK_SIZE, page=1)
+            return {record['id']: record for record in records}
+
+    values = {}
+    chunks = chunked(step.ids, BULK_CHUNK_SIZE)
+    for coins in map_concurrent(fetch, chunks, max_workers=max_workers, limiter=limiter):
+        for id, coin in coins.items():
+            values[id] = {field: coin.get(key) for field, key in step.fields.items()}
+    return values
+
+
+def execute_plan(cg, plan, max_workers=4, limiter=None):
+    """Run the steps of a plan, return {id: {field: value}} (None for the values the api did not return)"""
+
+    values = {id: dict.fromkeys(plan.fields) for id in plan.ids}
+    for step in plan.steps:
+        for id, coin in _run_step(cg, step, plan.vs_currency, max_workers, limiter).items():
+            if id in values:
+                values[id].update(coin)
+    return values
+
+
+def query_coins(cg, ids, fields, vs_currency='usd', max_workers=4, limiter=None):
+    """Return {id: {field: value}} for ids, fetched with the cheapest plan (see plan_query)"""
+
+    return execute_plan(cg, plan_query(ids, fields, vs_currency), max_workers=max_workers, limiter=limiter)
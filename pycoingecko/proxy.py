@@ -0,0 +1,185 @@
+"""Local caching proxy speaking the CoinGecko v3 path layout
+
+Run it with:
+
+    python -m pycoingecko.proxy --port 8765 --ttl 30 --rate 30
+
+and point the clients at it with CoinGeckoAPI(api_base_url='http://127.0.0.1:8765/api/v3/').
+Identical requests of all the clients share a cache, concurrent identical requests are coalesced into
+a single upstream call, and upstream calls are rate limited.
+"""
+import argparse
+import json
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from .ratelimit import RateLimiter
+from .transport import SessionTransport, strip_api_key
+
+API_URL_BASE = 'https://api.coingecko.com/api/v3/'
+PRO_API_URL_BASE = 'https://pro-api.coingecko.com/api/v3/'
+
+
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+
+
+class CachingProxy:
+    """Shared cache, request coalescing and rate limiting in front of the upstream api
+
+    get(path) takes the path and query of a request relative to the v3 base (e.g. 'simple/price?ids=bitcoin')
+    and returns (status, content type, body). Successful responses are cached for ttl seconds, at most
+    max_entries of them (least recently used evicted first; expired ones are dropped when met). Upstream
+    calls are limited to rate per minute; requests that cannot get a slot within max_wait seconds get a
+    429 response.
+    """
+
+    def __init__(self, upstream=None, api_key='', ttl=30, rate=30, max_wait=10, transport=None, max_entries=10000):
+        self.upstream = upstream or (PRO_API_URL_BASE if api_key else API_URL_BASE)
+        self.api_key = api_key
+        self.ttl = ttl
+        self.max_wait = max_wait
+        self.max_entries = max_entries
+        self.limiter = RateLimiter(rate) if rate else None
+        self.transport = transport if transport is not None else SessionTransport()
+        self._lock = threading.Lock()
+        # key -> (time stored, result), least recently used first
+        self._cache = OrderedDict()
+        self._in_flight = {}
+        self.stats = {'requests': 0, 'hits': 0, 'coalesced': 0, 'upstream': 0, 'throttled': 0}
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _upstream_url(self, path):
+        url = self.upstream + path
+        if self.api_key:
+            url += ('&' if '?' in url else '?') + 'x_cg_pro_api_key=' + self.api_key
+        return url
+
+    def _fetch(self, path):
+        if self.limiter is not None and not self.limiter.acquire(timeout=self.max_wait):
+            self._count('throttled')
+            return 429, 'application/json', json.dumps({'error': 'proxy rate limit exceeded'}).encode('utf-8')
+        self._count('upstream')
+        try:
+            response = self.transport.get(self._upstream_url(path), timeout=60)
+        except Exception as e:
+            return 502, 'application/json', json.dumps({'error': str(e)}).encode('utf-8')
+        content_type = response.headers.get('Content-Type', 'application/json')
+        return response.status_code, content_type, response.content
+
+    def _store(self, key, result):
+        now = time.monotonic()
+        with self._lock:
+            self._cache[key] = (now, result)
+            self._cache.move_to_end(key)
+            # drop the expired entries at the least recently used end, then the entries over max_entries
+            while self._cache and now - next(iter(self._cache.values()))[0] > self.ttl:
+                self._cache.popitem(last=False)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def get(self, path):
+        # the key of the clients is never forwarded nor part of the cache key
+        key = strip_api_key('http://proxy/' + path.lstrip('/'))[len('http://proxy/'):]
+        self._count('requests')
+
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if time.monotonic() - cached[0] <= self.ttl:
+                    self._cache.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return cached[1]
+                del self._cache[key]
+            in_flight = self._in_flight.get(key)
+            leader = in_flight is None
+            if leader:
+                in_flight = self._in_flight[key] = _InFlight()
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            in_flight.event.wait()
+            return in_flight.result
+
+        try:
+            result = self._fetch(key)
+            if result[0] == 200:
+                self._store(key, result)
+            in_flight.result = result
+        except Exception as e:
+            in_flight.result = (502, 'application/json', json.dumps({'error': str(e)}).encode('utf-8'))
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            in_flight.event.set()
+        return in_flight.result
+
+
+class ProxyRequestHandler(BaseHTTPRequestHandler):
+    proxy = None
+    prefix = '/api/v3/'
+
+    def do_GET(self):
+        path = urlsplit(self.path)
+        if path.path == '/_proxy/stats':
+            status, content_type, body = 200, 'application/json', json.dumps(self.proxy.stats).encode('utf-8')
+        elif path.path.startswith(self.prefix):
+            relative = path.path[len(self.prefix):] + ('?' + path.query if path.query else '')
+            status, content_type, body = self.proxy.get(relative)
+        else:
+            status, content_type, body = 404, 'application/json', b'{"error": "not found"}'
+
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(proxy, host='127.0.0.1', port=8765):
+    """Return a threading http server serving the proxy (port 0 picks a free port)"""
+
+    handler = type('Handler', (ProxyRequestHandler,), {'proxy': proxy})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m pycoingecko.proxy', description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--upstream', default=None, help='upstream v3 base url (default: public or pro api)')
+    parser.add_argument('--api-key', default='', help='pro api key used for upstream calls')
+    parser.add_argument('--ttl', type=float, default=30, help='cache ttl in seconds')
+    parser.add_argument('--rate', type=float, default=30, help='upstream calls per minute (0 for no limit)')
+    parser.add_argument('--max-entries', type=int, default=10000, help='maximum number of cached responses')
+    args = parser.parse_args(argv)
+
+    proxy = CachingProxy(upstream=args.upstream, api_key=args.api_key, ttl=args.ttl, rate=args.rate,
+                         max_entries=args.max_entries)
+    server = make_server(proxy, args.host, args.port)
+    print("Serving CoinGecko proxy on http://{0}:{1}/api/v3/ (upstream {2})".format(
+        args.host, server.server_port, proxy.upstream))
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+import threading
+import time
+
+import requests
+
+from .exceptions import CircuitOpenError, DeadlineExceeded
+from .resilience import is_failure_status
+from .timeouts import current_deadline
+
+
+class RateLimiter:
+    """Token bucket limiting calls to rate per period seconds (with bursts of up to burst calls)"""
+
+    def __init__(self, rate, period=60.0, burst=None):
+        self.rate = rate
+        self.period = period
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate / self.period)
+        self._updated_at = now
+
+    def try_acquire(self):
+        """Take a token if one is available, return whether it was"""
+
+        with self._lock:
+            self._refill()
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+    def acquire(self, timeout=None):
+        """Wait for a token (at most timeout seconds), return whether one was taken"""
+
+        end = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) * self.period / self.rate
+            if end is not None:
+                if time.monotonic() + wait > end:
+                    return False
+            time.sleep(wait)
+
+
+def is_overload_error(error):
+    """Return whether an error raised by a call means the api is overloaded
+
+    Connection errors, timeouts, open circuits and 429/5xx responses (raised as HTTPError, or as the
+    ValueError of their json body chained to it) are overload errors.
+    """
+
+    while error is not None:
+        if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout, CircuitOpenError)):
+            return True
+        response = getattr(error, 'response', None)
+        if isinstance(error, requests.exceptions.HTTPError) and response is not None:
+            return is_failure_status(response.status_code)
+        error = error.__cause__ or error.__context__
+    return False
+
+
+class AdaptiveConcurrencyLimiter:
+    """AIMD limit of the calls in flight, adapted to the observed latency and errors
+
+    The window grows by one call per window of successful calls (additive increase) and is multiplied
+    by decrease_factor on overload errors (see is_overload_error) or latency spikes, i.e. calls slower
+    than latency_factor times the smoothed latency of the successful calls (multiplicative decrease).
+    A single decrease is applied per round of calls in flight. window is the number of concurrent calls
+    the api currently allows.
+    """
+
+    def __init__(self, initial_window=4, min_window=1, max_window=32, decrease_factor=0.5, latency_factor=3.0,
+                 min_samples=10, smoothing=0.1):
+        self.min_window = min_window
+        self.max_window = max_window
+        self.decrease_factor = decrease_factor
+        self.latency_factor = latency_factor
+        self.min_samples = min_samples
+        self.smoothing = smoothing
+        self._window = float(min(max(initial_window, min_window), max_window))
+        self._in_flight = 0
+        self._latency = None
+        self._samples = 0
+        self._decreased_at = 0.0
+        self._condition = threading.Condition()
+        self.requests = 0
+        self.failures = 0
+        self.decreases = 0
+
+    @property
+    def window(self):
+        with self._condition:
+            return int(self._window)
+
+    @property
+    def in_flight(self):
+        with self._condition:
+            return self._in_flight
+
+    @property
+    def stats(self):
+        with self._condition:
+            return {'window': int(self._window), 'in_flight': self._in_flight, 'latency': self._latency,
+                    'requests': self.requests, 'failures': self.failures, 'decreases': self.decreases}
+
+    def acquire(self, timeout=None):
+        """Wait for room in the window (at most timeout seconds), return the start time of the call or None"""
+
+        with self._condition:
+            if not self._condition.wait_for(lambda: self._in_flight < int(self._window), timeout):
+                return None
+            self._in_flight += 1
+            return time.monotonic()
+
+    def release(self, started_at, failed=False):
+        """Record the outcome of a call started at started_at (as returned by acquire)"""
+
+        latency = time.monotonic() - started_at
+        with self._condition:
+            self._in_flight -= 1
+            self.requests += 1
+            spike = not failed and self._samples >= self.min_samples and \
+                latency > self.latency_factor * self._latency
+            if failed or spike:
+                self.failures += failed
+                # calls started before the last decrease saw the old window: do not decrease again
+                if started_at > self._decreased_at:
+                    self._window = max(self.min_window, self._window * self.decrease_factor)
+                    self._decreased_at = time.monotonic()
+                    self.decreases += 1
+            else:
+                self._latency = latency if self._latency is None else \
+                    self._latency + self.smoothing * (latency - self._latency)
+                self._samples += 1
+                self._window = min(self.max_window, self._window + 1.0 / self._window)
+            self._condition.notify_all()
+
+    def call(self, func, *args, **kwargs):
+        """Return func(*args, **kwargs) called within the window
+
+        Waiting for room is bounded by the deadline of the calling context.
+        """
+
+        deadline = current_deadline()
+        started_at = self.acquire(None if deadline is None else deadline.remaining())
+        if started_at is None:
+            raise DeadlineExceeded(deadline.seconds, {'in_flight': self.in_flight})
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.release(started_at, failed=is_overload_error(e))
+            raise
+        self.release(started_at)
+        return result
@@ -0,0 +1,165 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .exceptions import CircuitOpenError
+from .utils import get_endpoint_template
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+def is_failure_status(status_code):
+    """Return whether a response status means the upstream is unhealthy (429 or 5xx)"""
+
+    return status_code == 429 or status_code >= 500
+
+
+class CircuitBreaker:
+    """Per-endpoint circuit breaker
+
+    After failure_threshold consecutive failures (connection errors, timeouts, 429 or 5xx responses) the
+    circuit of the endpoint opens and calls fail fast with CircuitOpenError for reset_timeout seconds.
+    Then a single trial call is let through (half-open): its success closes the circuit, its failure
+    opens it again; requests sent before the circuit opened do not end the trial. Endpoints share the circuit of their key(endpoint), by default their template
+    (e.g. 'coins/*/tickers' for all the coins); key must be picklable to pickle the breaker. Copies and
+    pickles keep the settings only.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, key=get_endpoint_template):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.key = key
+        self._lock = threading.Lock()
+        # key -> [consecutive failures, opened at (or None), trial in flight]
+        self._circuits = {}
+
+    def state(self, endpoint):
+        with self._lock:
+            circuit = self._circuits.get(self.key(endpoint))
+            if circuit is None or circuit[1] is None:
+                return CLOSED
+            if time.monotonic() - circuit[1] < self.reset_timeout:
+                return OPEN
+            return HALF_OPEN
+
+    def before_request(self, endpoint):
+        """Raise CircuitOpenError if a request to the endpoint must not be sent
+
+        Return whether the request is the trial call of a half-open circuit: only that call passes
+        trial=True to record_success/record_failure and calls release.
+        """
+
+        with self._lock:
+            circuit = self._circuits.get(self.key(endpoint))
+            if circuit is None or circuit[1] is None:
+                return False
+            elapsed = time.monotonic() - circuit[1]
+            if elapsed < self.reset_timeout:
+                raise CircuitOpenError(endpoint, self.reset_timeout - elapsed)
+            if circuit[2]:
+                # only one trial request at a time while half-open
+                raise CircuitOpenError(endpoint, 0.0)
+            circuit[2] = True
+            return True
+
+    def release(self, endpoint):
+        """End the trial call of a half-open circuit without recording an outcome"""
+
+        with self._lock:
+            circuit = self._circuits.get(self.key(endpoint))
+            if circuit is not None:
+                circuit[2] = False
+
+    def record_success(self, endpoint, trial=False):
+        with self._lock:
+            key = self.key(endpoint)
+            circuit = self._circuits.get(key)
+            # a request sent before the circuit opened does not close it
+            if circuit is not None and (trial or circuit[1] is None):
+                del self._circuits[key]
+
+    def record_failure(self, endpoint, trial=False):
+        with self._lock:
+            circuit = self._circuits.setdefault(self.key(endpoint), [0, None, False])
+            circuit[0] += 1
+            if trial or circuit[0] >= self.failure_threshold:
+                circuit[1] = time.monotonic()
+            if trial:
+                circuit[2] = False
+
+    def __getstate__(self):
+        return {'failure_threshold': self.failure_threshold, 'reset_timeout': self.reset_timeout, 'key': self.key}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class StaleWhileRevalidate:
+    """Cache of the last good response per url, served immediately while refreshed in the background
+
+    Responses younger than max_age seconds are served without any request. Older ones are served as
+    they are while a single background refresh per url runs. Urls never fetched are fetched in the
+    calling thread. Failing refreshes keep the last good response. At most max_entries responses are
+    kept, the least recently used ones being evicted first. Copies and pickles keep the settings only.
+    """
+
+    def __init__(self, max_age=0, max_workers=4, max_entries=1024):
+        self.max_age = max_age
+        self.max_workers = max_workers
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        # url -> (time stored, response), least recently used first
+        self._responses = OrderedDict()
+        self._refreshing = set()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pycoingecko-swr')
+
+    def _store(self, url, response):
+        if response.ok:
+            with self._lock:
+                self._responses[url] = (time.monotonic(), response)
+                self._responses.move_to_end(url)
+                while len(self._responses) > self.max_entries:
+                    self._responses.popitem(last=False)
+
+    def _refresh(self, url, fetch):
+        try:
+            self._store(url, fetch(url))
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._refreshing.discard(url)
+
+    def get(self, url, fetch):
+        """Return the response of url, using fetch(url) to get fresh ones"""
+
+        with self._lock:
+            cached = self._responses.get(url)
+            if cached is not None:
+                self._responses.move_to_end(url)
+            refresh = cached is not None and time.monotonic() - cached[0] > self.max_age \
+                and url not in self._refreshing
+            if refresh:
+                self._refreshing.add(url)
+
+        if cached is None:
+            response = fetch(url)
+            self._store(url, response)
+            return response
+
+        if refresh:
+            self._executor.submit(self._refresh, url, fetch)
+        return cached[1]
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+    def __getstate__(self):
+        return {'max_age': self.max_age, 'max_workers': self.max_workers, 'max_entries': self.max_entries}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
@@ -0,0 +1,301 @@
+"""Vectorized helpers (numpy) over market chart and OHLC series returned by the client
+
+Series are handled in columnar form: a dict of equal-length numpy arrays with a 'coin' column, so
+that hundreds of coins are resampled/aggregated in a single batched call. Timestamps are in
+milliseconds, as returned by the api.
+"""
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+INTERVALS = {
+    'm': 60 * 1000,
+    'h': 60 * 60 * 1000,
+    'd': 24 * 60 * 60 * 1000,
+}
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for series helpers (pip install numpy)")
+
+
+def interval_to_ms(interval):
+    """Return an interval ('5m', '1h', '1d' or a number of seconds) in milliseconds"""
+
+    if isinstance(interval, str):
+        return int(interval[:-1] or 1) * INTERVALS[interval[-1]]
+    return int(interval * 1000)
+
+
+def market_chart_to_columns(chart, coin=None):
+    """Return the output of get_coin_market_chart(_range)_by_id as columns
+
+    (timestamp, price, market_cap, total_volume; plus coin if given)
+    """
+
+    _require_numpy()
+    prices = np.asarray(chart.get('prices') or [], dtype=np.float64).reshape(-1, 2)
+    market_caps = np.asarray(chart.get('market_caps') or [], dtype=np.float64).reshape(-1, 2)
+    total_volumes = np.asarray(chart.get('total_volumes') or [], dtype=np.float64).reshape(-1, 2)
+
+    columns = {
+        'timestamp': prices[:, 0].astype(np.int64),
+        'price': prices[:, 1],
+        # market caps/volumes may be missing for a few points, align them on the price timestamps
+        'market_cap': _align(prices[:, 0], market_caps),
+        'total_volume': _align(prices[:, 0], total_volumes),
+    }
+    if coin is not None:
+        columns['coin'] = np.full(len(prices), coin, dtype=object)
+    return columns
+
+
+def ohlc_to_columns(ohlc, coin=None):
+    """Return the output of get_coin_ohlc_by_id(_range) as columns (timestamp, open, high, low, close; plus coin if given)"""
+
+    _require_numpy()
+    data = np.asarray(ohlc or [], dtype=np.float64).reshape(-1, 5)
+    columns = {
+        'timestamp': data[:, 0].astype(np.int64),
+        'open': data[:, 1],
+        'high': data[:, 2],
+        'low': data[:, 3],
+        'close': data[:, 4],
+    }
+    if coin is not None:
+        columns['coin'] = np.full(len(data), coin, dtype=object)
+    return columns
+
+
+def _align(timestamps, pairs):
+    if len(pairs) == len(timestamps) and np.array_equal(pairs[:, 0], timestamps):
+        return pairs[:, 1]
+    values = np.full(len(timestamps), np.nan)
+    if len(pairs):
+        index = np.searchsorted(pairs[:, 0], timestamps)
+        found = index < len(pairs)
+        found[found] = pairs[index[found], 0] == timestamps[found]
+        values[found] = pairs[index[found], 1]
+    return values
+
+
+def concat_columns(columns_by_coin):
+    """Concatenate the columns of several coins ({coin: columns}) into a single batch of columns"""
+
+    _require_numpy()
+    batches = [dict(columns, coin=np.full(len(columns['timestamp']), coin, dtype=object))
+               for coin, columns in columns_by_coin.items()]
+    if not batches:
+        return {}
+    return {name: np.concatenate([batch[name] for batch in batches]) for name in batches[0]}
+
+
+def market_charts_to_columns(charts):
+    """Return a batch of columns from several market charts ({coin: get_coin_market_chart_by_id output})"""
+
+    return concat_columns({coin: market_chart_to_columns(chart) for coin, chart in charts.items()})
+
+
+def ohlcs_to_columns(ohlcs):
+    """Return a batch of columns from several OHLC series ({coin: get_coin_ohlc_by_id output})"""
+
+    return concat_columns({coin: ohlc_to_columns(ohlc) for coin, ohlc in ohlcs.items()})
+
+
+def _group_codes(columns):
+    coins = columns.get('coin')
+    if coins is None:
+        return None, np.zeros(len(columns['timestamp']), dtype=np.int64)
+    labels, codes = np.unique(coins, return_inverse=True)
+    return labels, codes.reshape(-1)
+
+
+def _sort(columns):
+    """Return the columns sorted by coin and timestamp, with the coin labels and integer coin codes"""
+
+    labels, codes = _group_codes(columns)
+    order = np.lexsort((columns['timestamp'], codes))
+    columns = {name: values[order] for name, values in columns.items()}
+    return columns, labels, codes[order]
+
+
+def _bounds(codes, keys):
+    """Return the start/end (exclusive) indexes of runs of equal (code, key) in sorted arrays"""
+
+    n = len(codes)
+    if n == 0:
+        return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    change = np.empty(n, dtype=bool)
+    change[0] = True
+    change[1:] = (codes[1:] != codes[:-1]) | (keys[1:] != keys[:-1])
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], n)
+    return starts, ends
+
+
+def resample(columns, interval, price='price', volume='total_volume'):
+    """Resample point series (e.g. market chart columns) to OHLC bars
+
+    Return columns coin (if present), timestamp (bar start), open, high, low, close, volume (if the
+    volume column exists), vwap and count. Market chart volumes are rolling 24h volumes: volume is the
+    last one of the bar (summing them has no meaning), and the vwap they give weights prices by the
+    traded volume around each point.
+    """
+
+    _require_numpy()
+    step = interval_to_ms(interval)
+    columns, labels, codes = _sort(columns)
+    buckets = columns['timestamp'] // step
+    starts, ends = _bounds(codes, buckets)
+    if not len(starts):
+        return _empty_bars(columns, volume)
+
+    prices = columns[price]
+    bars = {
+        'timestamp': buckets[starts] * step,
+        'open': prices[starts],
+        'high': np.maximum.reduceat(prices, starts),
+        'low': np.minimum.reduceat(prices, starts),
+        'close': prices[ends - 1],
+        'count': ends - starts,
+    }
+    if volume in columns:
+        volumes = np.nan_to_num(columns[volume])
+        bars['volume'] = volumes[ends - 1]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            bars['vwap'] = np.add.reduceat(prices * volumes, starts) / np.add.reduceat(volumes, starts)
+    if labels is not None:
+        bars['coin'] = labels[codes[starts]]
+    return bars
+
+
+def resample_ohlc(columns, interval, label='close'):
+    """Resample OHLC bars (e.g. 30-minute get_coin_ohlc_by_id output) to a coarser interval
+
+    label tells what the timestamps mark: 'close' (the api candles: a 30-minute candle stamped 01:00
+    covers 00:30-01:00) or 'open'. The resampled bars are stamped the same way.
+    """
+
+    _require_numpy()
+    if label not in ('open', 'close'):
+        raise ValueError("Unknown label '{0}' (expected open or close)".format(label))
+    step = interval_to_ms(interval)
+    columns, labels, codes = _sort(columns)
+    shift = 1 if label == 'close' else 0
+    # a close time on a bar boundary belongs to the bar ending there
+    buckets = (columns['timestamp'] - shift) // step
+    starts, ends = _bounds(codes, buckets)
+    if not len(starts):
+        return _empty_bars(columns, None)
+
+    bars = {
+        'timestamp': (buckets[starts] + shift) * step,
+        'open': columns['open'][starts],
+        'high': np.maximum.reduceat(columns['high'], starts),
+        'low': np.minimum.reduceat(columns['low'], starts),
+        'close': columns['close'][ends - 1],
+        'count': ends - starts,
+    }
+    if labels is not None:
+        bars['coin'] = labels[codes[starts]]
+    return bars
+
+
+def _empty_bars(columns, volume):
+    bars = {name: np.zeros(0) for name in ('open', 'high', 'low', 'close')}
+    bars['timestamp'] = np.zeros(0, dtype=np.int64)
+    bars['count'] = np.zeros(0, dtype=np.int64)
+    if volume is not None and volume in columns:
+        bars['volume'] = np.zeros(0)
+        bars['vwap'] = np.zeros(0)
+    if 'coin' in columns:
+        bars['coin'] = np.zeros(0, dtype=object)
+    return bars
+
+
+def fill_gaps(bars, interval):
+    """Insert the missing bars of regular series, carrying the last value forward
+
+    Every coin gets one row per interval between its first and last bar. Filled rows get the previous
+    close as open/high/low/close, the previous (rolling 24h) volume, a zero count, and are flagged in
+    the 'filled' column.
+    """
+
+    _require_numpy()
+    step = interval_to_ms(interval)
+    bars, labels, codes = _sort(bars)
+    buckets = bars['timestamp'] // step
+    starts, ends = _bounds(codes, np.zeros_like(codes))
+    if not len(starts):
+        return dict(bars, filled=np.zeros(0, dtype=bool))
+
+    first = buckets[starts]
+    sizes = buckets[ends - 1] - first + 1
+    offsets = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    total = int(sizes.sum())
+
+    # position of every existing bar in the filled output
+    run = np.repeat(np.arange(len(starts)), ends - starts)
+    positions = offsets[run] + buckets - first[run]
+
+    # index of the existing bar to carry forward for every output row (groups always start with a bar)
+    source = np.full(total, -1, dtype=np.int64)
+    source[positions] = np.arange(len(buckets))
+    source = np.maximum.accumulate(source)
+    filled = np.ones(total, dtype=bool)
+    filled[positions] = False
+
+    out_run = np.repeat(np.arange(len(starts)), sizes)
+    out = {'timestamp': (first[out_run] + np.arange(total) - offsets[out_run]) * step}
+    for name, values in bars.items():
+        if name == 'timestamp':
+            continue
+        values = values[source]
+        if name in ('open', 'high', 'low') and 'close' in bars:
+            values = np.where(filled, bars['close'][source], values)
+        elif name == 'count':
+            values = np.where(filled, 0, values)
+        out[name] = values
+    out['filled'] = filled
+    return out
+
+
+def returns(columns, value='close', log=False):
+    """Return the period returns of a value column per coin (nan for the first row of every coin)
+
+    The columns must be sorted by coin and timestamp (as returned by resample/fill_gaps).
+    """
+
+    _require_numpy()
+    values = np.asarray(columns[value], dtype=np.float64)
+    result = np.full(len(values), np.nan)
+    if len(values) < 2:
+        return result
+    _, codes = _group_codes(columns)
+    same = codes[1:] == codes[:-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if log:
+            change = np.log(values[1:] / values[:-1])
+        else:
+            change = values[1:] / values[:-1] - 1
+    result[1:] = np.where(same, change, np.nan)
+    return result
+
+
+def vwap(columns, price='price', volume='total_volume'):
+    """Return the volume-weighted average price of every coin as {coin: vwap}"""
+
+    _require_numpy()
+    labels, codes = _group_codes(columns)
+    prices = np.asarray(columns[price], dtype=np.float64)
+    volumes = np.nan_to_num(np.asarray(columns[volume], dtype=np.float64))
+    n_groups = len(labels) if labels is not None else 1
+    weighted = np.bincount(codes, weights=prices * volumes, minlength=n_groups)
+    total = np.bincount(codes, weights=volumes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        result = weighted / total
+    if labels is None:
+        return {None: result[0]}
+    return dict(zip(labels.tolist(), result.tolist()))
@@ -0,0 +1,269 @@
+"""Latest-price table in a memory-mapped file, written by one publisher and read lock-free by many processes
+
+File layout (little endian):
+
+    header   magic (8 bytes) | layout version (u32) | coins (u32) | currencies (u32) | index size (u32)
+             | data offset (u64) | sequence (u64) | updated at (f64)
+    index    json {"coins": [...], "currencies": [...]}
+    data     coins x currencies float64 prices (nan when unknown)
+
+The sequence implements a seqlock: the publisher makes it odd before writing the prices and even after;
+readers retry while it is odd or changed during their read. A publisher reuses an existing file with the
+same coins and currencies in place; otherwise it replaces the file and sets the sequence of the old one
+to RETIRED, so that its readers map the new file.
+"""
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b'CGPRICE1'
+LAYOUT_VERSION = 1
+HEADER = struct.Struct('<8sIIIIQQd')
+SEQUENCE_OFFSET = 8 + 4 * 4 + 8
+PRICE = struct.Struct('<d')
+SEQUENCE = struct.Struct('<Q')
+# sequence of a replaced file (odd: never readable)
+RETIRED = 2 ** 64 - 1
+
+
+class PriceTable:
+    """Memory-mapped table of prices indexed by coin id and vs_currency"""
+
+    def __init__(self, path, coins=None, currencies=None, read_timeout=1.0):
+        """Create the table file if coins and currencies are given, otherwise open an existing one
+
+        Reads waiting more than read_timeout seconds for a write to complete raise TimeoutError.
+        """
+
+        self.path = path
+        self.read_timeout = read_timeout
+        self._writable = coins is not None
+        if self._writable:
+            coins = list(coins)
+            currencies = [c.lower() for c in currencies]
+            if not self._matches(path, coins, currencies):
+                self._create(path, coins, currencies)
+        self._open()
+        if self._writable and self.sequence & 1:
+            # left odd by a publisher stopped mid-write
+            SEQUENCE.pack_into(self._map, SEQUENCE_OFFSET, self.sequence + 1)
+
+    def _open(self):
+        self._file = open(self.path, 'r+b' if self._writable else 'rb')
+        access = mmap.ACCESS_WRITE if self._writable else mmap.ACCESS_READ
+        self._map = mmap.mmap(self._file.fileno(), 0, access=access)
+
+        magic, version, n_coins, n_currencies, index_size, data_offset, _, _ = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC or version != LAYOUT_VERSION:
+            raise ValueError("{0} is not a price table".format(self.path))
+        index = json.loads(bytes(self._map[HEADER.size:HEADER.size + index_size]).decode('utf-8'))
+        self.coins = index['coins']
+        self.currencies = index['currencies']
+        self._n_currencies = n_currencies
+        self._data_offset = data_offset
+        self._coin_index = {coin: i for i, coin in enumerate(self.coins)}
+        self._currency_index = {currency: i for i, currency in enumerate(self.currencies)}
+
+    @staticmethod
+    def _index(coins, currencies):
+        return json.dumps({'coins': coins, 'currencies': currencies}).encode('utf-8')
+
+    @classmethod
+    def _matches(cls, path, coins, currencies):
+        """Return whether path is a price table of coins and currencies"""
+
+        index = cls._index(coins, currencies)
+        try:
+            with open(path, 'rb') as f:
+                header = f.read(HEADER.size)
+                if len(header) < HEADER.size:
+                    return False
+                magic, version, _, _, index_size, _, sequence, _ = HEADER.unpack(header)
+                return (magic == MAGIC and version == LAYOUT_VERSION and sequence != RETIRED
+                        and f.read(index_size) == index)
+        except FileNotFoundError:
+            return False
+
+    @classmethod
+    def _create(cls, path, coins, currencies):
+        index = cls._index(coins, currencies)
+        # align the prices on 8 bytes
+        data_offset = (HEADER.size + len(index) + 7) // 8 * 8
+        tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, LAYOUT_VERSION, len(coins), len(currencies), len(index), data_offset, 0, 0.0))
+            f.write(index)
+            f.write(b'\0' * (data_offset - HEADER.size - len(index)))
+            f.write(PRICE.pack(math.nan) * (len(coins) * len(currencies)))
+        try:
+            old = open(path, 'r+b')
+        except FileNotFoundError:
+            old = None
+        # readers opening the path always see a complete file
+        os.replace(tmp_path, path)
+        if old is not None:
+            with old:
+                header = old.read(HEADER.size)
+                if len(header) == HEADER.size and header[:len(MAGIC)] == MAGIC:
+                    # readers of the old file find it retired and map the new one
+                    old.seek(SEQUENCE_OFFSET)
+                    old.write(SEQUENCE.pack(RETIRED))
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def _wait(self, started):
+        """Wait for the write in progress, mapping the new file when this one was replaced"""
+
+        if SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0] == RETIRED:
+            self.close()
+            self._open()
+        elif time.monotonic() - started > self.read_timeout:
+            raise TimeoutError("{0} has been written for more than {1}s (publisher stopped mid-write?)".format(
+                self.path, self.read_timeout))
+        else:
+            # let a publisher thread of this process finish its write
+            time.sleep(0)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _offset(self, coin, currency):
+        return self._data_offset + 8 * (self._coin_index[coin] * self._n_currencies + self._currency_index[currency])
+
+    @property
+    def sequence(self):
+        return SEQUENCE.unpack_from(self._map, SEQUENCE_OFFSET)[0]
+
+    @property
+    def updated_at(self):
+        return struct.unpack_from('<d', self._map, SEQUENCE_OFFSET + 8)[0]
+
+    def get(self, coin, currency):
+        """Return the latest price of coin in currency (None if not published yet)
+
+        Raise KeyError for coins or currencies that are not in the table.
+        """
+
+        started = None
+        while True:
+            data = self._map
+            before = SEQUENCE.unpack_from(data, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                started = started or time.monotonic()
+                self._wait(started)
+                continue
+            price = PRICE.unpack_from(data, self._offset(coin, currency.lower()))[0]
+            if SEQUENCE.unpack_from(data, SEQUENCE_OFFSET)[0] == before:
+                return None if price != price else price
+
+    def snapshot(self):
+        """Return a consistent copy of the whole table as {coin: {currency: price}}"""
+
+        started = None
+        while True:
+            data = self._map
+            before = SEQUENCE.unpack_from(data, SEQUENCE_OFFSET)[0]
+            if before & 1:
+                started = started or time.monotonic()
+                self._wait(started)
+                continue
+            size = 8 * len(self.coins) * self._n_currencies
+            raw = data[self._data_offset:self._data_offset + size]
+            if SEQUENCE.unpack_from(data, SEQUENCE_OFFSET)[0] == before:
+                break
+        prices = iter(struct.unpack('<{0}d'.format(len(self.coins) * self._n_currencies), raw))
+        table = {}
+        for coin in self.coins:
+            values = zip(self.currencies, prices)
+            # nan (unknown) prices are left out
+            table[coin] = {currency: price for currency, price in values if price == price}
+        return table
+
+    def write(self, prices):
+        """Write the prices of a get_price response ({coin: {currency: price}}) as one consistent update"""
+
+        if self.sequence == RETIRED:
+            # replaced by another publisher
+            self.close()
+            self._open()
+        data = self._map
+        sequence = SEQUENCE.unpack_from(data, SEQUENCE_OFFSET)[0]
+        SEQUENCE.pack_into(data, SEQUENCE_OFFSET, sequence + 1)
+        try:
+            for coin, values in prices.items():
+                if coin not in self._coin_index:
+                    continue
+                for currency, price in values.items():
+                    if currency in self._currency_index:
+                        PRICE.pack_into(data, self._offset(coin, currency), math.nan if price is None else price)
+            struct.pack_into('<d', data, SEQUENCE_OFFSET + 8, time.time())
+        finally:
+            SEQUENCE.pack_into(data, SEQUENCE_OFFSET, sequence + 2)
+
+
+class PricePublisher:
+    """Poll /simple/price for a fixed set of coins and currencies and publish the prices to a PriceTable file
+
+    Readers in other processes open PriceTable(path) and call get(coin, currency) without any http call.
+    """
+
+    def __init__(self, cg, path, ids, vs_currencies, interval=30, chunk_size=250):
+        self.cg = cg
+        self.ids = list(ids)
+        self.vs_currencies = [c.lower() for c in vs_currencies]
+        self.interval = interval
+        self.chunk_size = chunk_size
+        self.table = PriceTable(path, self.ids, self.vs_currencies)
+        self._stop = threading.Event()
+        self._thread = None
+
+    def publish(self):
+        """Fetch the prices once and write them to the table"""
+
+        prices = {}
+        for i in range(0, len(self.ids), self.chunk_size):
+            prices.update(self.cg.get_price(self.ids[i:i + self.chunk_size], self.vs_currencies))
+        self.table.write(prices)
+        return prices
+
+    def start(self):
+        """Publish every interval seconds in a background thread"""
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='pycoingecko-price-publisher', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.publish()
+            except Exception:
+                # keep the last published prices, try again on next interval
+                pass
+            self._stop.wait(self.interval)
+
+    def close(self):
+        self.stop()
+        self.table.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.close()
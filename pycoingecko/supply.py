@@ -0,0 +1,173 @@
+"""Supply history of many coins (numpy): circulating and total supply charts as aligned columns"""
+
+import json
+import sqlite3
+import threading
+import time
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .paging import map_concurrent
+
+# kind -> (client method with days, client method with a range, key of the points in the response)
+KINDS = {
+    'circulating_supply': ('get_coin_circulating_supply_chart', 'get_coin_circulating_supply_chart_range',
+                           'circulating_supply'),
+    'total_supply': ('get_coin_total_supply_chart', 'get_coin_total_supply_chart_range', 'total_supply'),
+}
+
+# 90 days: longer ranges only have daily points
+WINDOW = 90 * 24 * 60 * 60
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for supply charts (pip install numpy)")
+
+
+class SupplyCache:
+    """Permanent sqlite cache of the supply chart points of completed windows
+
+    Windows ending in the past never change, so they are kept forever.
+    """
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute('CREATE TABLE IF NOT EXISTS supply '
+                                     '(kind TEXT NOT NULL, id TEXT NOT NULL, window_index INTEGER NOT NULL, '
+                                     'points TEXT NOT NULL, PRIMARY KEY (kind, id, window_index))')
+
+    def get(self, kind, id, window):
+        with self._lock:
+            row = self._connection.execute('SELECT points FROM supply WHERE kind = ? AND id = ? AND window_index = ?',
+                                           (kind, id, window)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, kind, id, window, points):
+        with self._lock, self._connection:
+            self._connection.execute('INSERT OR REPLACE INTO supply (kind, id, window_index, points) '
+                                     'VALUES (?, ?, ?, ?)',
+                                     (kind, id, window, json.dumps(points, separators=(',', ':'))))
+
+    def __len__(self):
+        with self._lock:
+            return self._connection.execute('SELECT COUNT(*) FROM supply').fetchone()[0]
+
+    def close(self):
+        self._connection.close()
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _to_array(points):
+    """Return [[timestamp, value], ...] (values may be strings) as an (n, 2) float array"""
+
+    return np.array([(point[0], _float(point[1])) for point in points or []], dtype=np.float64).reshape(-1, 2)
+
+
+def _merge(parts):
+    """Return the points of several charts sorted by timestamp, without duplicates"""
+
+    points = np.concatenate(parts) if parts else np.zeros((0, 2))
+    _, index = np.unique(points[:, 0], return_index=True)
+    return points[index]
+
+
+def _previous(points, timestamps):
+    """Return the values of points at timestamps, carrying the previous value forward (nan before the first)"""
+
+    values = np.full(len(timestamps), np.nan)
+    index = np.searchsorted(points[:, 0], timestamps, side='right') - 1
+    found = index >= 0
+    values[found] = points[index[found], 1]
+    return values
+
+
+def get_supply_charts(cg, ids, days=None, from_timestamp=None, to_timestamp=None,
+                      kinds=('circulating_supply', 'total_supply'), cache=None, max_workers=4, limiter=None,
+                      **kwargs):
+    """Fetch the supply charts of ids concurrently and return them as aligned columns
+
+    Give either days (/coins/{id}/*_supply_chart, relative to now) or from_timestamp and to_timestamp
+    (unix seconds, /coins/{id}/*_supply_chart/range). Ranges are fetched in windows of WINDOW seconds;
+    the points of completed windows are stored in cache (a SupplyCache, or the path of its sqlite
+    file) and never fetched again. Return columns coin, timestamp (ms) and one column per kind, the
+    kinds of a coin being aligned on the union of their timestamps (a value holds until the next point).
+    """
+
+    _require_numpy()
+    if days is None and (from_timestamp is None or to_timestamp is None):
+        raise ValueError("Either days or from_timestamp and to_timestamp are required")
+    for kind in kinds:
+        if kind not in KINDS:
+            raise ValueError("Unknown kind '{0}' (expected one of {1})".format(kind, ', '.join(KINDS)))
+    own_cache = isinstance(cache, str)
+    if own_cache:
+        cache = SupplyCache(cache)
+    try:
+        ids = list(ids)
+
+        # (kind, id) -> list of point arrays
+        charts = {(kind, id): [] for kind in kinds for id in ids}
+        if days is not None:
+            tasks = [(kind, id, None) for kind in kinds for id in ids]
+        else:
+            windows = range(int(from_timestamp) // WINDOW, int(to_timestamp) // WINDOW + 1)
+            tasks = []
+            for kind in kinds:
+                for id in ids:
+                    for window in windows:
+                        points = cache.get(kind, id, window) if cache is not None else None
+                        if points is None:
+                            tasks.append((kind, id, window))
+                        else:
+                            charts[(kind, id)].append(_to_array(points))
+
+        now = time.time()
+
+        def fetch(task):
+            kind, id, window = task
+            method_name, range_method_name, key = KINDS[kind]
+            if window is None:
+                return getattr(cg, method_name)(id, days, **kwargs).get(key)
+            start = window * WINDOW
+            points = getattr(cg, range_method_name)(id, start, start + WINDOW, **kwargs).get(key) or []
+            if cache is not None and start + WINDOW < now:
+                cache.put(kind, id, window, points)
+            return points
+
+        results = map_concurrent(fetch, tasks, max_workers=max_workers, limiter=limiter)
+        for (kind, id, _), points in zip(tasks, results):
+            charts[(kind, id)].append(_to_array(points))
+
+        columns = {name: [] for name in ('coin', 'timestamp') + tuple(kinds)}
+        for id in ids:
+            points = {kind: _merge(charts[(kind, id)]) for kind in kinds}
+            if days is None:
+                # windows overlap the requested range: keep the points inside it
+                for kind in kinds:
+                    timestamps = points[kind][:, 0]
+                    inside = (timestamps >= from_timestamp * 1000) & (timestamps <= to_timestamp * 1000)
+                    points[kind] = points[kind][inside]
+            timestamps = np.unique(np.concatenate([points[kind][:, 0] for kind in kinds]))
+            columns['coin'].append(np.full(len(timestamps), id, dtype=object))
+            columns['timestamp'].append(timestamps.astype(np.int64))
+            for kind in kinds:
+                columns[kind].append(_previous(points[kind], timestamps))
+
+        return {name: np.concatenate(values) if values else np.zeros(0) for name, values in columns.items()}
+    finally:
+        if own_cache:
+            # the cache was opened here
+            cache.close()
@@ -0,0 +1,196 @@
+import json
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+from .paging import iter_pages
+
+# tickers per page of /coins/{id}/tickers and /exchanges/{id}/tickers
+TICKERS_PER_PAGE = 100
+
+
+def _require_numpy():
+    if np is None:
+        raise ImportError("numpy is required for tickers aggregation (pip install numpy)")
+
+
+def _fetch_all_tickers(method, id, max_workers, limiter=None, **kwargs):
+    def fetch_page(page):
+        return method(id, page=page, **kwargs).get('tickers') or []
+
+    tickers = []
+    for items in iter_pages(fetch_page, TICKERS_PER_PAGE, max_workers=max_workers, limiter=limiter):
+        tickers.extend(items)
+    return tickers
+
+
+def get_coin_tickers_all(cg, id, depth=False, max_workers=4, limiter=None, **kwargs):
+    """Return all the tickers of a coin, fetching the /coins/{id}/tickers pages concurrently
+
+    With a limiter (AdaptiveConcurrencyLimiter), its window bounds the concurrent pages instead of
+    max_workers.
+    """
+
+    if depth:
+        kwargs['depth'] = True
+    return _fetch_all_tickers(cg.get_coin_ticker_by_id, id, max_workers, limiter=limiter, **kwargs)
+
+
+def get_exchange_tickers_all(cg, id, depth=False, max_workers=4, limiter=None, **kwargs):
+    """Return all the tickers of an exchange, fetching the /exchanges/{id}/tickers pages concurrently
+
+    With a limiter (AdaptiveConcurrencyLimiter), its window bounds the concurrent pages instead of
+    max_workers.
+    """
+
+    if depth:
+        kwargs['depth'] = True
+    return _fetch_all_tickers(cg.get_exchanges_tickers_by_id, id, max_workers, limiter=limiter, **kwargs)
+
+
+def page_to_columns(raw):
+    """Decoder transform converting the raw content of a tickers page to columns (see tickers_to_columns)"""
+
+    return tickers_to_columns(json.loads(raw).get('tickers') or [])
+
+
+def get_coin_tickers_columns(cg, id, depth=False, max_workers=4, decoder=None, limiter=None, **kwargs):
+    """Return all the tickers of a coin as columns, fetching pages concurrently
+
+    With a decoder (ProcessPoolDecoder), pages are fetched undecoded and converted to columns in its
+    process pool.
+    """
+
+    if decoder is None:
+        return tickers_to_columns(get_coin_tickers_all(cg, id, depth=depth, max_workers=max_workers,
+                                                       limiter=limiter, **kwargs))
+
+    if depth:
+        kwargs['depth'] = True
+
+    def fetch_page(page):
+        return decoder.run(page_to_columns, cg.get_coin_ticker_by_id(id, page=page, raw=True, **kwargs))
+
+    pages = list(iter_pages(fetch_page, TICKERS_PER_PAGE, max_workers=max_workers,
+                            count=lambda columns: len(columns['pair']), limiter=limiter))
+    return {name: np.concatenate([page[name] for page in pages]) for name in pages[0]}
+
+
+def _float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def tickers_to_columns(tickers):
+    """Return tickers as numpy columns
+
+    (base, target, pair, exchange, last, volume, last_usd, volume_usd, spread_percentage,
+    cost_to_move_up_usd, cost_to_move_down_usd, is_stale, is_anomaly)
+    """
+
+    _require_numpy()
+    n = len(tickers)
+    columns = {
+        'base': np.empty(n, dtype=object),
+        'target': np.empty(n, dtype=object),
+        'exchange': np.empty(n, dtype=object),
+    }
+    floats = ('last', 'volume', 'last_usd', 'volume_usd', 'spread_percentage', 'cost_to_move_up_usd',
+              'cost_to_move_down_usd')
+    for name in floats:
+        columns[name] = np.empty(n)
+    columns['is_stale'] = np.zeros(n, dtype=bool)
+    columns['is_anomaly'] = np.zeros(n, dtype=bool)
+
+    for i, ticker in enumerate(tickers):
+        columns['base'][i] = ticker.get('base')
+        columns['target'][i] = ticker.get('target')
+        columns['exchange'][i] = (ticker.get('market') or {}).get('identifier')
+        columns['last'][i] = _float(ticker.get('last'))
+        columns['volume'][i] = _float(ticker.get('volume'))
+        columns['last_usd'][i] = _float((ticker.get('converted_last') or {}).get('usd'))
+        columns['volume_usd'][i] = _float((ticker.get('converted_volume') or {}).get('usd'))
+        columns['spread_percentage'][i] = _float(ticker.get('bid_ask_spread_percentage'))
+        columns['cost_to_move_up_usd'][i] = _float(ticker.get('cost_to_move_up_usd'))
+        columns['cost_to_move_down_usd'][i] = _float(ticker.get('cost_to_move_down_usd'))
+        columns['is_stale'][i] = bool(ticker.get('is_stale'))
+        columns['is_anomaly'][i] = bool(ticker.get('is_anomaly'))
+
+    columns['pair'] = np.array(['{0}/{1}'.format(b, t) for b, t in zip(columns['base'], columns['target'])],
+                               dtype=object)
+    return columns
+
+
+def _arg_best(codes, values, n_groups):
+    """Return the index of the max value of every group (values must not hold nan)"""
+
+    order = np.lexsort((values, codes))
+    last = np.flatnonzero(np.append(codes[order][1:] != codes[order][:-1], True))
+    best = np.full(n_groups, -1, dtype=np.int64)
+    best[codes[order][last]] = order[last]
+    return best
+
+
+def aggregate_tickers(columns, include_stale=False, include_anomaly=False):
+    """Aggregate tickers across exchanges per pair (base/target)
+
+    Bid/ask of a ticker are derived from its last price and bid_ask_spread_percentage. Return columns
+    pair, best_bid, best_bid_exchange, best_ask, best_ask_exchange, spread_percentage (best ask over
+    best bid), depth_up_usd/depth_down_usd (sum of the +2%/-2% depth, needs depth=True tickers),
+    vwap (volume-weighted last price), volume and exchanges (number of tickers).
+    """
+
+    _require_numpy()
+    keep = np.ones(len(columns['pair']), dtype=bool)
+    if not include_stale:
+        keep &= ~columns['is_stale']
+    if not include_anomaly:
+        keep &= ~columns['is_anomaly']
+    keep &= ~np.isnan(columns['last'])
+    columns = {name: values[keep] for name, values in columns.items()}
+
+    pairs, codes = np.unique(columns['pair'], return_inverse=True)
+    codes = codes.reshape(-1)
+    n = len(pairs)
+    last = columns['last']
+    half_spread = np.nan_to_num(columns['spread_percentage']) / 200.0
+    bids = last * (1 - half_spread)
+    asks = last * (1 + half_spread)
+    volumes = np.nan_to_num(columns['volume'])
+
+    best_bid_index = _arg_best(codes, bids, n)
+    best_ask_index = _arg_best(codes, -asks, n)
+    weighted = np.bincount(codes, weights=last * volumes, minlength=n)
+    volume = np.bincount(codes, weights=volumes, minlength=n)
+
+    best_bid = bids[best_bid_index] if n else np.zeros(0)
+    best_ask = asks[best_ask_index] if n else np.zeros(0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        spread = (best_ask - best_bid) / ((best_ask + best_bid) / 2) * 100
+        vwap = weighted / volume
+
+    return {
+        'pair': pairs,
+        'best_bid': best_bid,
+        'best_bid_exchange': columns['exchange'][best_bid_index] if n else np.zeros(0, dtype=object),
+        'best_ask': best_ask,
+        'best_ask_exchange': columns['exchange'][best_ask_index] if n else np.zeros(0, dtype=object),
+        'spread_percentage': spread,
+        'depth_up_usd': np.bincount(codes, weights=np.nan_to_num(columns['cost_to_move_up_usd']), minlength=n),
+        'depth_down_usd': np.bincount(codes, weights=np.nan_to_num(columns['cost_to_move_down_usd']), minlength=n),
+        'vwap': vwap,
+        'volume': volume,
+        'exchanges': np.bincount(codes, minlength=n),
+    }
+
+
+def get_coin_tickers_summary(cg, id, depth=True, max_workers=4, decoder=None, limiter=None, **kwargs):
+    """Fetch all the tickers of a coin and aggregate them per pair across exchanges (see aggregate_tickers)"""
+
+    columns = get_coin_tickers_columns(cg, id, depth=depth, max_workers=max_workers, decoder=decoder,
+                                       limiter=limiter, **kwargs)
+    return aggregate_tickers(columns)
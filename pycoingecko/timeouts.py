@@ -0,0 +1,98 @@
+import contextvars
+import time
+from contextlib import contextmanager
+
+from .exceptions import DeadlineExceeded
+
+# per-call request timeout and overall deadline, set with call_options() / deadline()
+_call_timeout = contextvars.ContextVar('pycoingecko_call_timeout', default=None)
+_deadline = contextvars.ContextVar('pycoingecko_deadline', default=None)
+
+
+class Deadline:
+    """Point in time after which no more requests are sent"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return time.monotonic() >= self.expires_at
+
+    def check(self, progress=None):
+        """Raise DeadlineExceeded if the deadline has passed"""
+
+        if self.expired():
+            raise DeadlineExceeded(self.seconds, progress)
+
+
+def current_deadline():
+    """Return the deadline of the current context (None if there is none)"""
+
+    return _deadline.get()
+
+
+@contextmanager
+def deadline(seconds):
+    """Bound every request sent in the context (including retries, pages and batches) to seconds from now
+
+    A deadline nested in another one never extends it. Yields the Deadline.
+    """
+
+    if seconds is None:
+        yield _deadline.get()
+        return
+    new = Deadline(seconds)
+    outer = _deadline.get()
+    if outer is not None and outer.expires_at < new.expires_at:
+        new = outer
+    token = _deadline.set(new)
+    try:
+        yield new
+    finally:
+        _deadline.reset(token)
+
+
+@contextmanager
+def call_options(timeout=None, deadline_seconds=None):
+    """Set the request timeout and deadline of the api calls made in the context"""
+
+    token = _call_timeout.set(timeout) if timeout is not None else None
+    try:
+        with deadline(deadline_seconds):
+            yield
+    finally:
+        if token is not None:
+            _call_timeout.reset(token)
+
+
+def request_timeout(default, progress=None):
+    """Return the timeout to use for a request: the per-call timeout (or default), capped to the deadline
+
+    Raise DeadlineExceeded (with progress) if no time is left before the deadline.
+    """
+
+    timeout = _call_timeout.get()
+    if timeout is None:
+        timeout = default
+    current = _deadline.get()
+    if current is None:
+        return timeout
+
+    remaining = current.remaining()
+    if remaining <= 0:
+        raise DeadlineExceeded(current.seconds, progress)
+    if timeout is None:
+        return remaining
+    if isinstance(timeout, tuple):
+        return tuple(remaining if t is None else min(t, remaining) for t in timeout)
+    return min(timeout, remaining)
+
+
+def submit(executor, fn, *args):
+    """Submit fn to an executor running it in a copy of the current context (timeouts and deadline)"""
+
+    return executor.submit(contextvars.copy_context().run, fn, *args)
@@ -0,0 +1,244 @@
+import gzip
+import json
+import os
+import random
+import threading
+import time
+import weakref
+from http.client import responses as http_reasons
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import Retry
+from requests.structures import CaseInsensitiveDict
+
+from .timeouts import current_deadline
+
+API_KEY_PARAMS = ('x_cg_pro_api_key', 'x_cg_demo_api_key')
+
+
+def strip_api_key(url):
+    """Return the url without any api key query parameter"""
+
+    parts = urlsplit(url)
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if k not in API_KEY_PARAMS]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query, safe=',:/'), parts.fragment))
+
+
+def _open(path, mode):
+    if str(path).endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
+
+
+def build_response(url, status_code, content, headers=None):
+    """Return a requests.Response built from raw values"""
+
+    response = requests.Response()
+    response.url = url
+    response.status_code = status_code
+    response.reason = http_reasons.get(status_code, '')
+    response._content = content if isinstance(content, bytes) else content.encode('utf-8')
+    response._content_consumed = True
+    response.headers = CaseInsensitiveDict(headers or {})
+    response.encoding = 'utf-8'
+    return response
+
+
+class DeadlineRetry(Retry):
+    """urllib3 Retry that stops retrying once the deadline of the current context has passed"""
+
+    def is_exhausted(self):
+        deadline = current_deadline()
+        return super().is_exhausted() or (deadline is not None and deadline.expired())
+
+    def get_backoff_time(self):
+        backoff = super().get_backoff_time()
+        deadline = current_deadline()
+        if deadline is not None:
+            backoff = min(backoff, deadline.remaining())
+        return backoff
+
+
+class SessionTransport:
+    """Default transport: a requests session with urllib3 retries
+
+    The session is created lazily in every process, so that a transport inherited through a fork
+    (preforking servers, multiprocessing) never shares the pooled sockets of its parent, and with
+    per_thread=True in every thread. Pickled transports keep their settings only.
+    """
+
+    def __init__(self, retries=5, per_thread=False):
+        self.retries = retries
+        self.per_thread = per_thread
+        self._reset()
+
+    def _reset(self):
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._session = None
+        # sessions of this process, for close (per-thread sessions go away with their thread)
+        self._sessions = weakref.WeakSet()
+
+    def _new_session(self):
+        session = requests.Session()
+        retries = DeadlineRetry(total=self.retries, backoff_factor=0.5, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(max_retries=retries)
+        session.mount('https://', adapter)
+        # plain http for local proxies (see pycoingecko.proxy)
+        session.mount('http://', adapter)
+        self._sessions.add(session)
+        return session
+
+    @property
+    def session(self):
+        """Session of the current process (and thread with per_thread=True)"""
+
+        if self._pid != os.getpid():
+            # forked: drop the parent sessions without closing them, their sockets are still the parent's
+            self._reset()
+        if self.per_thread:
+            session = getattr(self._local, 'session', None)
+            if session is None:
+                with self._lock:
+                    session = self._local.session = self._new_session()
+            return session
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def get(self, url, timeout=None):
+        return self.session.get(url, timeout=timeout)
+
+    def close(self):
+        if self._pid != os.getpid():
+            return
+        with self._lock:
+            sessions = list(self._sessions)
+            self._session = None
+            self._local = threading.local()
+        for session in sessions:
+            session.close()
+
+    def __getstate__(self):
+        return {'retries': self.retries, 'per_thread': self.per_thread}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+
+class RecordingTransport:
+    """Transport that forwards requests to another transport and records every request/response pair
+
+    Pairs are appended to a cassette file (json lines, gzip compressed if path ends with .gz)
+    with any api key stripped from the recorded urls.
+    """
+
+    def __init__(self, path, transport=None):
+        self.transport = transport if transport is not None else SessionTransport()
+        self.path = path
+        self._file = _open(path, 'a')
+        self._lock = threading.Lock()
+
+    @property
+    def session(self):
+        return getattr(self.transport, 'session', None)
+
+    def get(self, url, timeout=None):
+        start = time.monotonic()
+        response = self.transport.get(url, timeout=timeout)
+        elapsed = time.monotonic() - start
+
+        record = {
+            'url': strip_api_key(url),
+            'status': response.status_code,
+            'elapsed': round(elapsed, 4),
+            'content_type': response.headers.get('Content-Type'),
+            'body': response.content.decode('utf-8', errors='replace'),
+        }
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+        return response
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+        if hasattr(self.transport, 'close'):
+            self.transport.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ReplayTransport:
+    """Transport that serves responses from a cassette file recorded by RecordingTransport
+
+    Requests are matched on their url (api key stripped); several recordings of the same url are
+    served in turn. latency adds a fixed delay in seconds to every response, or replays the recorded
+    durations if set to 'recorded' (scaled by speed). A fraction error_rate of the requests fails,
+    either with an error_status response or, if error_status is None, with a ConnectionError.
+    """
+
+    def __init__(self, path, latency=0.0, speed=1.0, error_rate=0.0, error_status=503, seed=None):
+        self.latency = latency
+        self.speed = speed
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._recordings = {}
+        self._positions = {}
+
+        with _open(path, 'r') as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._recordings.setdefault(record['url'], []).append(record)
+
+    def __len__(self):
+        return sum(len(records) for records in self._recordings.values())
+
+    def _next_record(self, url):
+        key = strip_api_key(url)
+        with self._lock:
+            records = self._recordings.get(key)
+            if not records:
+                return None
+            position = self._positions.get(key, 0)
+            self._positions[key] = position + 1
+            return records[position % len(records)]
+
+    def get(self, url, timeout=None):
+        record = self._next_record(url)
+        if record is None:
+            raise requests.exceptions.ConnectionError("No recorded response for {0}".format(strip_api_key(url)))
+
+        delay = record.get('elapsed', 0.0) / self.speed if self.latency == 'recorded' else self.latency
+        read_timeout = timeout[-1] if isinstance(timeout, tuple) else timeout
+        if read_timeout is not None and delay > read_timeout:
+            time.sleep(read_timeout)
+            raise requests.exceptions.ReadTimeout("Replayed response for {0} timed out".format(record['url']))
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            inject_error = self.error_rate and self._random.random() < self.error_rate
+        if inject_error:
+            if self.error_status is None:
+                raise requests.exceptions.ConnectionError("Injected connection error for {0}".format(record['url']))
+            return build_response(url, self.error_status, json.dumps({'error': 'injected error'}))
+
+        headers = {'Content-Type': record['content_type']} if record.get('content_type') else None
+        return build_response(url, record['status'], record['body'], headers)
+
+    def close(self):
+        pass
@@ -1,7 +1,41 @@
+import contextvars
+import functools
+from urllib.parse import urlsplit
+
+from .timeouts import call_options
+
+# set by the raw=True call option: return the undecoded response content (bytes)
+raw_content = contextvars.ContextVar('pycoingecko_raw_content', default=False)
+# set by the fields=[...] call option: dotted field paths kept in the decoded response
+projection = contextvars.ContextVar('pycoingecko_projection', default=None)
+# name of the client method being called, set for clients with a usage ledger
+called_method = contextvars.ContextVar('pycoingecko_called_method', default=None)
+
+
 def func_args_preprocessing(func):
-    """Return function that converts list input arguments to comma-separated strings"""
+    """Return function that converts list input arguments to comma-separated strings
 
+    The timeout (request timeout in seconds or (connect, read) tuple), deadline (overall seconds,
+    retries included), raw (return the response bytes without decoding them) and fields (dotted paths
+    kept in the decoded response, see project_content) arguments are call options, not api parameters.
+    On a lean client, the payload-reducing params of the endpoint (client.LEAN_PARAMS) are sent unless
+    given.
+    """
+
+    @functools.wraps(func)
     def input_args(*args, **kwargs):
+        timeout = kwargs.pop('timeout', None)
+        deadline = kwargs.pop('deadline', None)
+        raw = kwargs.pop('raw', False)
+        fields = kwargs.pop('fields', None)
+
+        if args and getattr(args[0], 'lean', False):
+            for key, value in args[0].LEAN_PARAMS.get(func.__name__, {}).items():
+                kwargs.setdefault(key, value)
+        if args and getattr(args[0], 'ledger', None) is not None:
+            method_token = called_method.set(func.__name__)
+        else:
+            method_token = None
 
         # check in **kwargs for lists and booleans
         for v in kwargs:
@@ -9,7 +43,20 @@ def func_args_preprocessing(func):
         # check in *args for lists and booleans
         args = [arg_preprocessing(v) for v in args]
 
-        return func(*args, **kwargs)
+        try:
+            if timeout is None and deadline is None and not raw and fields is None:
+                return func(*args, **kwargs)
+            raw_token = raw_content.set(bool(raw))
+            projection_token = projection.set(fields)
+            try:
+                with call_options(timeout=timeout, deadline_seconds=deadline):
+                    return func(*args, **kwargs)
+            finally:
+                projection.reset(projection_token)
+                raw_content.reset(raw_token)
+        finally:
+            if method_token is not None:
+                called_method.reset(method_token)
 
     return input_args
 
@@ -36,3 +83,83 @@ def get_comma_separated_values(values):
 
     return ','.join(values)
 
+
+
+def get_endpoint(url):
+    """Return the endpoint path of an api url (e.g. 'coins/bitcoin/tickers'), without base url and params"""
+
+    path = urlsplit(url).path
+    if '/api/v3/' in path:
+        path = path.split('/api/v3/', 1)[1]
+    return path.strip('/')
+
+
+# literal segments of the api endpoint paths, any other segment is a path parameter (id, network, address...)
+ENDPOINT_SEGMENTS = frozenset([
+    'all.json', 'asset_platforms', 'categories', 'circulating_supply_chart', 'coins', 'companies', 'contract',
+    'decentralized_finance_defi', 'derivatives', 'dexes', 'exchange_rates', 'exchanges', 'global', 'history',
+    'indexes', 'list', 'market_cap_chart', 'market_chart', 'markets', 'multi', 'networks', 'new', 'new_pools', 'nfts',
+    'ohlc', 'onchain', 'ping', 'pools', 'price', 'public_treasury', 'range', 'search', 'simple',
+    'supported_vs_currencies', 'tickers', 'token_lists', 'token_price', 'tokens', 'top_gainers_losers',
+    'total_supply_chart', 'trending', 'trending_pools', 'volume_chart',
+])
+
+
+def get_endpoint_template(endpoint):
+    """Return an endpoint path with its path parameters replaced by '*' (e.g. 'coins/*/tickers')"""
+
+    return '/'.join(part if part in ENDPOINT_SEGMENTS else '*' for part in endpoint.split('/'))
+
+
+def get_path(record, path):
+    """Return the value at a dotted path of a record (None if any part is missing)"""
+
+    for part in path.split('.'):
+        if not isinstance(record, dict):
+            return None
+        record = record.get(part)
+    return record
+
+
+def fields_tree(fields):
+    """Return the tree of dotted field paths (e.g. ['id', 'market_data.current_price.usd']); None marks a kept leaf"""
+
+    tree = {}
+    for field in fields:
+        node = tree
+        parts = field.split('.')
+        for part in parts[:-1]:
+            child = node.get(part, {})
+            if child is None:
+                # a parent is already kept whole
+                break
+            node = node.setdefault(part, child)
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def project(value, tree):
+    """Return value keeping only the fields of tree (lists are projected item by item)"""
+
+    if isinstance(value, list):
+        return [project(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {key: value[key] if subtree is None else project(value[key], subtree)
+            for key, subtree in tree.items() if key in value}
+
+
+def project_content(content, fields):
+    """Project an api response on fields
+
+    Lists of records are projected record by record and JSON:API payloads ('data'/'included') resource
+    by resource, always keeping their id and type.
+    """
+
+    tree = fields_tree(fields)
+    if isinstance(content, dict) and 'data' in content:
+        tree = dict(tree, id=None, type=None)
+        return {key: project(value, tree) if key in ('data', 'included') else value
+                for key, value in content.items()}
+    return project(content, tree)
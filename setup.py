@@ -12,6 +12,13 @@ setuptools.setup(
     author = 'Christoforou Manolis',
     author_email = 'emchristoforou@gmail.com',
     install_requires=['requests'],
+    extras_require={
+        'export': ['pyarrow'],
+        'series': ['numpy'],
+        'tickers': ['numpy'],
+        'asof': ['numpy'],
+        'supply': ['numpy'],
+    },
     url = 'https://github.com/man-c/pycoingecko',
     classifiers=[
         "Programming Language :: Python :: 3",
@@ -0,0 +1,79 @@
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+
+np = pytest.importorskip('numpy')
+
+from pycoingecko.asof import MAX_HOURLY_RANGE, WINDOW, AsOfPrices, get_prices_asof  # noqa: E402
+
+
+class TestAsOf(unittest.TestCase):
+
+    def setUp(self):
+        self.prices = AsOfPrices()
+        self.prices.add('bitcoin', [100, 200, 300], [1.0, 2.0, 3.0])
+
+    def test_previous(self):
+        values = self.prices.lookup('bitcoin', [50, 100, 150, 300, 400])
+        np.testing.assert_array_equal(values, [np.nan, 1.0, 1.0, 3.0, 3.0])
+
+    def test_nearest_with_tolerance(self):
+        values = self.prices.lookup('bitcoin', [50, 140, 160, 400], mode='nearest', tolerance=60)
+        np.testing.assert_array_equal(values, [1.0, 1.0, 2.0, np.nan])
+
+    def test_interpolate(self):
+        values = self.prices.lookup(['bitcoin', 'bitcoin', 'ethereum', 'bitcoin'], [150, 50, 150, 250],
+                                    mode='interpolate')
+        np.testing.assert_array_equal(values, [1.5, np.nan, np.nan, 2.5])
+
+    def test_add_replaces_equal_timestamps(self):
+        # Act
+        self.prices.add('bitcoin', [200, 250], [20.0, 25.0])
+
+        ## Assert
+        timestamps, prices = self.prices.series('bitcoin')
+        assert timestamps.tolist() == [100, 200, 250, 300]
+        assert prices.tolist() == [1.0, 20.0, 25.0, 3.0]
+
+    def test_unknown_mode(self):
+        with pytest.raises(ValueError):
+            self.prices.lookup('bitcoin', [100], mode='vwap')
+
+    @responses.activate
+    def test_fetches_covering_windows_once(self):
+        # Arrange
+        start = 10 * WINDOW
+        chart = {"prices": [[start * 1000, 100.0], [(start + 3600) * 1000, 110.0]]}
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range?vs_currency=usd&from={0}&to={1}'.format(start - 3600, start + WINDOW),
+                      json=chart, status=200)
+        prices = AsOfPrices()
+        events = [start + 10, start + 3700, start + 5000]
+
+        # Act
+        values = get_prices_asof(CoinGeckoAPI(), ['bitcoin'] * 3, events, prices=prices)
+        again = get_prices_asof(CoinGeckoAPI(), 'bitcoin', events, mode='nearest', prices=prices)
+
+        ## Assert
+        np.testing.assert_array_equal(values, [100.0, 110.0, 110.0])
+        np.testing.assert_array_equal(again, [100.0, 110.0, 110.0])
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_fetched_ranges_have_hourly_points(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/market_chart/range',
+                      json={"prices": []}, status=200)
+
+        # Act
+        AsOfPrices().fetch(CoinGeckoAPI(), 'bitcoin', [10 * WINDOW + 10, 11 * WINDOW + 10])
+
+        ## Assert
+        assert len(responses.calls) == 2
+        for call in responses.calls:
+            params = call.request.params
+            assert int(params['to']) - int(params['from']) <= 90 * 86400
+        with pytest.raises(ValueError):
+            AsOfPrices(padding=MAX_HOURLY_RANGE - WINDOW + 1)
@@ -0,0 +1,107 @@
+import threading
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.converter import CurrencyConverter
+
+EXCHANGE_RATES = {"rates": {
+    "btc": {"name": "Bitcoin", "unit": "BTC", "value": 1.0, "type": "crypto"},
+    "usd": {"name": "US Dollar", "unit": "$", "value": 30000.0, "type": "fiat"},
+    "eur": {"name": "Euro", "unit": "€", "value": 27000.0, "type": "fiat"},
+}}
+
+
+class TestConverter(unittest.TestCase):
+
+    @responses.activate
+    def test_rate_and_convert(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/exchange_rates',
+                      json=EXCHANGE_RATES, status=200)
+        converter = CurrencyConverter(CoinGeckoAPI())
+
+        # Act Assert
+        assert converter.rate('usd', 'eur') == pytest.approx(0.9)
+        assert converter.convert([100.0, None, 10.0], 'usd', 'EUR') == pytest.approx([90.0, None, 9.0])
+        assert converter.convert(1, 'btc', 'usd') == 30000.0
+        assert converter.currencies() == ['btc', 'eur', 'usd']
+        # rates table is cached
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_unsupported_currency(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/exchange_rates',
+                      json=EXCHANGE_RATES, status=200)
+
+        # Act Assert
+        with pytest.raises(ValueError):
+            CurrencyConverter(CoinGeckoAPI()).rate('usd', 'xyz')
+
+    @responses.activate
+    def test_convert_prices(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/exchange_rates',
+                      json=EXCHANGE_RATES, status=200)
+        prices = {"bitcoin": {"usd": 30000.0, "usd_market_cap": 6e11, "usd_24h_change": 1.5}}
+
+        # Act
+        converted = CurrencyConverter(CoinGeckoAPI()).convert_prices(prices, ['eur', 'btc'])
+
+        ## Assert
+        assert converted['bitcoin']['eur'] == pytest.approx(27000.0)
+        assert converted['bitcoin']['btc'] == pytest.approx(1.0)
+        assert converted['bitcoin']['eur_market_cap'] == pytest.approx(5.4e11)
+        assert 'eur_24h_change' not in converted['bitcoin']
+
+    def test_reads_during_refreshes(self):
+        # Arrange
+        cg = type('StubAPI', (), {'get_exchange_rates': lambda self: EXCHANGE_RATES})()
+        converter = CurrencyConverter(cg, ttl=60)
+        stop = threading.Event()
+        errors = []
+
+        def refresh():
+            while not stop.is_set():
+                converter.refresh()
+
+        def read():
+            try:
+                for _ in range(2000):
+                    converter.rate('usd', 'eur')
+            except Exception as e:
+                errors.append(e)
+
+        # Act
+        assert converter.updated_at is None
+        refresher = threading.Thread(target=refresh)
+        readers = [threading.Thread(target=read) for _ in range(4)]
+        refresher.start()
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        stop.set()
+        refresher.join()
+
+        ## Assert
+        assert errors == []
+        assert converter.updated_at is not None
+
+    @responses.activate
+    def test_background_refresh(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/exchange_rates',
+                      json=EXCHANGE_RATES, status=200)
+
+        # Act
+        with CurrencyConverter(CoinGeckoAPI(), refresh_interval=60) as converter:
+            converter._thread.join(0.2)
+            rate = converter.rate('eur', 'usd')
+
+        ## Assert
+        assert rate == pytest.approx(30000.0 / 27000.0)
+        assert len(responses.calls) == 1
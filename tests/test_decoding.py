@@ -0,0 +1,83 @@
+import json
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.decoding import ProcessPoolDecoder, decode_json, get_coins_list_columns
+
+
+class TestDecoding(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.decoder = ProcessPoolDecoder(max_workers=2)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.decoder.close()
+
+    @responses.activate
+    def test_raw_call_option(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping',
+                      json={'gecko_says': '(V3) To the Moon!'}, status=200)
+
+        # Act
+        raw = CoinGeckoAPI().ping(raw=True)
+
+        ## Assert
+        assert isinstance(raw, bytes)
+        assert self.decoder.run(decode_json, raw) == {'gecko_says': '(V3) To the Moon!'}
+        assert responses.calls[0].request.url == 'https://api.coingecko.com/api/v3/ping'
+
+    @responses.activate
+    def test_get_coins_list_columns(self):
+        # Arrange
+        json_response = [{"id": "usd-coin", "symbol": "usdc", "name": "USDC",
+                          "platforms": {"ethereum": "0xa0b8", "solana": "EPjF"}},
+                         {"id": "bitcoin", "symbol": "btc", "name": "Bitcoin", "platforms": {}}]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/list?include_platform=true',
+                      json=json_response, status=200)
+
+        # Act
+        columns = get_coins_list_columns(CoinGeckoAPI(), decoder=self.decoder)
+
+        ## Assert
+        assert columns['id'] == ['usd-coin', 'bitcoin']
+        assert columns['platform'] == ['ethereum', 'solana']
+        assert columns['platform_coin'] == [0, 0]
+
+    @responses.activate
+    def test_export_batches_with_decoder(self):
+        pa = pytest.importorskip('pyarrow')
+        from pycoingecko.export import iter_dataset_batches
+
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/nfts/markets?per_page=250&page=1',
+                      json=[{"id": "pudgy-penguins", "floor_price": {"usd": 8100}}], status=200)
+
+        # Act
+        batches = list(iter_dataset_batches(CoinGeckoAPI(), 'nfts_markets', decoder=self.decoder))
+
+        ## Assert
+        assert len(batches) == 1
+        assert batches[0].column('floor_price_usd').to_pylist() == [8100.0]
+
+    @responses.activate
+    def test_tickers_columns_with_decoder(self):
+        pytest.importorskip('numpy')
+        from pycoingecko.tickers import get_coin_tickers_columns
+
+        # Arrange
+        tickers = [{"base": "BTC", "target": "USDT", "market": {"identifier": "binance"}, "last": 27000, "volume": 1}]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/tickers?page=1',
+                      body=json.dumps({"name": "Bitcoin", "tickers": tickers}), status=200)
+
+        # Act
+        columns = get_coin_tickers_columns(CoinGeckoAPI(), 'bitcoin', decoder=self.decoder)
+
+        ## Assert
+        assert columns['pair'].tolist() == ['BTC/USDT']
+        assert columns['last'].tolist() == [27000.0]
@@ -0,0 +1,84 @@
+import sys
+import unittest
+
+from pycoingecko.diff import DIGEST_SIZE, SnapshotDiffer
+
+
+class TestSnapshotDiff(unittest.TestCase):
+
+    def test_markets_diff(self):
+        # Arrange
+        differ = SnapshotDiffer('coins_markets', ignore=['last_updated'])
+        first = [{"id": "bitcoin", "current_price": 27000, "last_updated": "t0"},
+                 {"id": "ethereum", "current_price": 1800, "last_updated": "t0"},
+                 {"id": "dogecoin", "current_price": 0.07, "last_updated": "t0"}]
+        second = [{"id": "bitcoin", "current_price": 27100, "last_updated": "t1"},
+                  {"id": "ethereum", "current_price": 1800, "last_updated": "t1"},
+                  {"id": "solana", "current_price": 20, "last_updated": "t1"}]
+
+        # Act
+        initial = differ.update(first)
+        diff = differ.update(second)
+
+        ## Assert
+        assert len(initial.added) == 3
+        assert [row['id'] for row in diff.added] == ['solana']
+        assert diff.removed == ['dogecoin']
+        assert diff.changed == {'bitcoin': {'current_price': 27100}}
+        assert len(differ) == 3
+
+    def test_values_colliding_under_hash(self):
+        # Arrange
+        differ = SnapshotDiffer('coins_markets')
+        differ.update([{"id": "bitcoin", "price_change_percentage_24h": -1.0, "market_cap_rank": -1,
+                        "roi": {"percentage": -1}, "is_stale": 1, "ath": float('nan')}])
+
+        # Act
+        diff = differ.update([{"id": "bitcoin", "price_change_percentage_24h": -2.0, "market_cap_rank": -2,
+                               "roi": {"percentage": -2}, "is_stale": True, "ath": float('nan')}])
+
+        ## Assert
+        assert diff.changed == {'bitcoin': {'price_change_percentage_24h': -2.0, 'market_cap_rank': -2,
+                                            'roi': {'percentage': -2}, 'is_stale': True}}
+
+    def test_keeps_fixed_size_digests(self):
+        # Arrange
+        differ = SnapshotDiffer('coins_markets')
+        rows = [{"id": "coin{0}".format(i), "name": "Coin {0}".format(i) * 10, "current_price": i * 1.5,
+                 "market_cap_rank": i, "roi": {"times": i, "currency": "usd"}} for i in range(1000)]
+
+        # Act
+        differ.update(rows)
+
+        ## Assert
+        state = differ._previous.values()
+        assert all(isinstance(digests, bytes) and len(digests) == 5 * DIGEST_SIZE for digests in state)
+        assert sum(sys.getsizeof(digests) for digests in state) < sum(sys.getsizeof(row) for row in rows)
+
+    def test_unchanged_snapshot(self):
+        # Arrange
+        differ = SnapshotDiffer('derivatives')
+        rows = [{"market": "Binance (Futures)", "symbol": "BTCUSDT", "price": "27000", "extra": {"a": [1, 2]}}]
+        differ.update(rows)
+
+        # Act
+        diff = differ.update([dict(row) for row in rows])
+
+        ## Assert
+        assert not diff
+
+    def test_tickers_new_and_missing_fields(self):
+        # Arrange
+        differ = SnapshotDiffer('tickers')
+        ticker = {"base": "BTC", "target": "USDT", "market": {"identifier": "binance"}, "last": 27000}
+        differ.update([ticker])
+
+        # Act
+        diff = differ.update([dict(ticker, bid_ask_spread_percentage=0.01)])
+        unchanged = differ.update([dict(ticker, bid_ask_spread_percentage=0.01)])
+        removed_field = differ.update([ticker])
+
+        ## Assert
+        assert diff.changed == {('binance', 'BTC', 'USDT'): {'bid_ask_spread_percentage': 0.01}}
+        assert not unchanged
+        assert removed_field.changed == {('binance', 'BTC', 'USDT'): {'bid_ask_spread_percentage': None}}
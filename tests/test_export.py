@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+
+pa = pytest.importorskip('pyarrow')
+import pyarrow.ipc
+import pyarrow.parquet
+
+from pycoingecko.export import export_snapshot, records_to_batch
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_records_to_batch(self):
+        # Arrange
+        records = [{"market": "Binance (Futures)", "symbol": "BTCUSDT", "price": "27000.5", "funding_rate": 0.01,
+                    "last_traded_at": 1683000000, "expired_at": None}]
+
+        # Act
+        batch = records_to_batch(records, 'derivatives')
+
+        ## Assert
+        assert batch.num_rows == 1
+        assert batch.column('price').to_pylist() == [27000.5]
+        assert batch.column('expired_at').to_pylist() == [None]
+        assert batch.schema.field('last_traded_at').type == pa.int64()
+
+    @responses.activate
+    def test_export_coins_markets_parquet(self):
+        # Arrange
+        page_1 = [{"id": "coin{0}".format(i), "symbol": "c{0}".format(i), "current_price": i} for i in range(250)]
+        page_2 = [{"id": "bitcoin", "symbol": "btc", "current_price": 27000, "market_cap_rank": 1}]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/markets?per_page=250&page=1&vs_currency=usd',
+                      json=page_1, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/markets?per_page=250&page=2&vs_currency=usd',
+                      json=page_2, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/markets?per_page=250&page=3&vs_currency=usd',
+                      json=[], status=200)
+        path = os.path.join(self.tmpdir.name, 'markets.parquet')
+
+        # Act
+        rows = export_snapshot(CoinGeckoAPI(), 'coins_markets', path, max_workers=2, vs_currency='usd')
+
+        ## Assert
+        table = pa.parquet.read_table(path)
+        assert rows == 251
+        assert table.num_rows == 251
+        assert table.column('id').to_pylist()[-1] == 'bitcoin'
+        assert table.column('market_cap_rank').to_pylist()[-1] == 1
+
+    @responses.activate
+    def test_export_nfts_markets_arrow(self):
+        # Arrange
+        json_response = [{"id": "pudgy-penguins", "name": "Pudgy Penguins", "floor_price": {"native_currency": 4.5, "usd": 8100}}]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/nfts/markets?per_page=250&page=1',
+                      json=json_response, status=200)
+        path = os.path.join(self.tmpdir.name, 'nfts.arrow')
+
+        # Act
+        rows = export_snapshot(CoinGeckoAPI(), 'nfts_markets', path, format='arrow')
+
+        ## Assert
+        table = pa.ipc.open_file(path).read_all()
+        assert rows == 1
+        assert table.column('floor_price_usd').to_pylist() == [8100.0]
+
+    def test_export_unknown_dataset(self):
+        with pytest.raises(ValueError):
+            export_snapshot(CoinGeckoAPI(), 'unknown', os.path.join(self.tmpdir.name, 'x.parquet'))
@@ -0,0 +1,87 @@
+import asyncio
+import time
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.follow import Follower, SeenSet
+
+NEW_POOLS_URL = 'https://api.coingecko.com/api/v3/onchain/networks/eth/new_pools?page={0}'
+
+
+def pools(*ids):
+    return {"data": [{"id": "eth_{0}".format(id), "type": "pool",
+                      "attributes": {"pool_created_at": "2024-03-13T09:15:34Z"}} for id in ids]}
+
+
+class TestFollow(unittest.TestCase):
+
+    def test_seen_set_is_bounded(self):
+        # Arrange
+        seen = SeenSet(max_items=2)
+
+        # Act
+        for key in ('a', 'b', 'c'):
+            seen.add(key)
+
+        ## Assert
+        assert 'a' not in seen
+        assert 'b' in seen and 'c' in seen
+        assert len(seen) == 2
+
+    def test_seen_set_expires(self):
+        # Arrange
+        seen = SeenSet(ttl=0.01)
+        seen.add('a')
+
+        # Act
+        time.sleep(0.02)
+
+        ## Assert
+        assert 'a' not in seen
+
+    @responses.activate
+    def test_pages_until_seen_entries(self):
+        # Arrange
+        responses.add(responses.GET, NEW_POOLS_URL.format(1), json=pools(3, 2), status=200)
+        follower = Follower(CoinGeckoAPI(), 'onchain_new_pools', network='eth')
+        follower.poll()
+        responses.replace(responses.GET, NEW_POOLS_URL.format(1), json=pools(6, 5), status=200)
+        responses.add(responses.GET, NEW_POOLS_URL.format(2), json=pools(4, 3), status=200)
+
+        # Act
+        new = follower.poll()
+
+        ## Assert
+        assert [item['id'] for item in new] == ['eth_4', 'eth_5', 'eth_6']
+        assert [call.request.url for call in responses.calls] == [NEW_POOLS_URL.format(1), NEW_POOLS_URL.format(1),
+                                                                  NEW_POOLS_URL.format(2)]
+        stats = follower.stats
+        assert stats['new_items'] == 3
+        assert stats['requests'] == 3
+        assert stats['requests_per_item'] == 1.0
+        assert stats['latency_max'] > 0
+
+    @responses.activate
+    def test_coins_list_new_async(self):
+        # Arrange
+        coins = [{"id": "new-coin", "symbol": "new", "name": "New", "activated_at": int(time.time()) - 5}]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/list/new', json=coins, status=200)
+        follower = Follower(CoinGeckoAPI(), 'coins_list_new', include_existing=True, interval=0)
+
+        async def first():
+            async for item in follower:
+                return item
+
+        # Act
+        item = asyncio.run(first())
+
+        ## Assert
+        assert item['id'] == 'new-coin'
+        assert 5 <= follower.stats['latency_mean'] < 60
+
+    def test_unknown_feed(self):
+        with pytest.raises(ValueError):
+            Follower(CoinGeckoAPI(), 'trending')
@@ -0,0 +1,81 @@
+import multiprocessing
+import os
+import pickle
+import threading
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.transport import SessionTransport
+
+
+def ping(cg):
+    with responses.RequestsMock() as mock:
+        mock.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={'gecko_says': 'pong'}, status=200)
+        return cg.ping()
+
+
+def ping_in_child(conn, cg):
+    parent_session = cg.transport._session
+    conn.send((ping(cg), cg.session is not parent_session and parent_session is not None))
+    conn.close()
+
+
+class TestForkSafety(unittest.TestCase):
+
+    def test_pickle_keeps_settings_only(self):
+        # Arrange
+        cg = CoinGeckoAPI(retries=2, circuit_breaker=True, stale_while_revalidate=True, hedging=True,
+                          read_timeout=10, lean=True)
+        cg.circuit_breaker.record_failure('ping')
+        session = cg.session
+
+        # Act
+        clone = pickle.loads(pickle.dumps(cg))
+
+        ## Assert
+        assert clone.transport.retries == 2
+        assert clone.request_timeout == (120, 10)
+        assert clone.lean
+        assert clone.session is not session
+        assert clone.circuit_breaker.failure_threshold == 5
+        assert clone.circuit_breaker._circuits == {}
+        assert clone.hedging.endpoints == cg.hedging.endpoints
+        assert ping(clone) == {'gecko_says': 'pong'}
+
+    def test_session_per_thread(self):
+        # Arrange
+        transport = SessionTransport(per_thread=True)
+        sessions = []
+
+        # Act
+        thread = threading.Thread(target=lambda: sessions.append(transport.session))
+        thread.start()
+        thread.join()
+
+        ## Assert
+        assert transport.session is transport.session
+        assert sessions[0] is not transport.session
+        transport.close()
+
+    @pytest.mark.skipif(not hasattr(os, 'fork'), reason='requires fork')
+    def test_fork_rebuilds_session(self):
+        # Arrange
+        cg = CoinGeckoAPI(stale_while_revalidate=True)
+        cg.session
+        parent_swr = cg.stale_while_revalidate
+        context = multiprocessing.get_context('fork')
+        parent_conn, child_conn = context.Pipe()
+
+        # Act
+        process = context.Process(target=ping_in_child, args=(child_conn, cg))
+        process.start()
+        response, new_session = parent_conn.recv()
+        process.join()
+
+        ## Assert
+        assert response == {'gecko_says': 'pong'}
+        assert new_session
+        assert cg.stale_while_revalidate is parent_swr
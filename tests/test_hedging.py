@@ -0,0 +1,121 @@
+import itertools
+import json
+import threading
+import time
+import unittest
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.hedging import HedgePolicy, LatencyTracker
+from pycoingecko.transport import build_response
+
+
+class DelayedTransport:
+    """Transport answering each request after the next delay of a sequence"""
+
+    def __init__(self, delays):
+        self._delays = itertools.cycle(delays)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def get(self, url, timeout=None):
+        with self._lock:
+            delay = next(self._delays)
+            self.calls += 1
+            call = self.calls
+        time.sleep(delay)
+        return build_response(url, 200, json.dumps({"call": call}))
+
+
+class TestHedging(unittest.TestCase):
+
+    def test_latency_tracker(self):
+        # Arrange
+        tracker = LatencyTracker()
+        for latency in range(1, 101):
+            tracker.record('simple/price', latency / 100.0)
+
+        # Act Assert
+        assert tracker.percentile('simple/price', 95) == 0.95
+        assert tracker.percentile('ping', 95) is None
+
+    def test_hedge_wins(self):
+        # Arrange
+        hedging = HedgePolicy(delay=0.05, max_hedge_ratio=1.0)
+        cg = CoinGeckoAPI(transport=DelayedTransport([0.5, 0.0]), hedging=hedging)
+
+        # Act
+        start = time.monotonic()
+        response = cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert time.monotonic() - start < 0.4
+        assert response == {"call": 2}
+        assert hedging.stats == {'requests': 1, 'hedges_fired': 1, 'hedges_won': 1}
+
+    def test_fast_requests_are_not_hedged(self):
+        # Arrange
+        hedging = HedgePolicy(delay=0.2, max_hedge_ratio=1.0)
+        transport = DelayedTransport([0.0])
+        cg = CoinGeckoAPI(transport=transport, hedging=hedging)
+
+        # Act
+        cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert transport.calls == 1
+        assert hedging.stats['hedges_fired'] == 0
+
+    def test_hedge_budget(self):
+        # Arrange
+        hedging = HedgePolicy(delay=0.01, max_hedge_ratio=0.5)
+        transport = DelayedTransport([0.05])
+        cg = CoinGeckoAPI(transport=transport, hedging=hedging)
+
+        # Act
+        for _ in range(4):
+            cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert hedging.stats['hedges_fired'] == 2
+
+    def test_other_endpoints_are_not_hedged(self):
+        # Arrange
+        hedging = HedgePolicy(delay=0.0, max_hedge_ratio=1.0)
+        transport = DelayedTransport([0.05])
+        cg = CoinGeckoAPI(transport=transport, hedging=hedging)
+
+        # Act
+        cg.ping()
+
+        ## Assert
+        assert transport.calls == 1
+        assert hedging.stats['requests'] == 0
+
+    def test_queued_requests_are_not_hedged(self):
+        # Arrange
+        hedging = HedgePolicy(delay=0.5, max_hedge_ratio=1.0, max_workers=8)
+        transport = DelayedTransport([0.3])
+        cg = CoinGeckoAPI(transport=transport, hedging=hedging)
+        threads = [threading.Thread(target=cg.get_price, args=('bitcoin', 'usd')) for _ in range(24)]
+
+        # Act
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ## Assert
+        assert transport.calls == 24
+        assert hedging.stats['hedges_fired'] == 0
+
+    def test_latencies_are_kept_per_endpoint_template(self):
+        # Arrange
+        hedging = HedgePolicy(max_hedge_ratio=0.0)
+        cg = CoinGeckoAPI(transport=DelayedTransport([0.0]), hedging=hedging)
+
+        # Act
+        cg.get_onchain_token_price('eth', '0xabc')
+        cg.get_onchain_token_price('bsc', '0xdef')
+
+        ## Assert
+        assert hedging.latencies.count('onchain/simple/networks/*/token_price/*') == 2
@@ -0,0 +1,98 @@
+import datetime
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.history import HistoryCache, date_range, get_coins_history_range
+
+
+def history(price):
+    return {"id": "bitcoin", "market_data": {"current_price": {"usd": price}, "market_cap": {"usd": price * 10},
+                                             "total_volume": {"usd": price * 2}}}
+
+
+class TestHistory(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache_path = os.path.join(self.tmpdir.name, 'history.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_date_range(self):
+        assert date_range('2023-01-30', '2023-02-01') == [datetime.date(2023, 1, 30), datetime.date(2023, 1, 31),
+                                                          datetime.date(2023, 2, 1)]
+
+    @responses.activate
+    def test_get_coins_history_range(self):
+        # Arrange
+        for day, price in ((1, 100.0), (2, 110.0)):
+            responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/history?localization=false&date=0{0}-01-2023'.format(day),
+                          json=history(price), status=200)
+
+        # Act
+        with mock.patch.object(HistoryCache, 'close', autospec=True, side_effect=HistoryCache.close) as close:
+            columns = get_coins_history_range(CoinGeckoAPI(), ['bitcoin'], '2023-01-01', '2023-01-02',
+                                              cache=self.cache_path)
+
+        ## Assert
+        assert columns['price'] == [100.0, 110.0]
+        assert columns['market_cap'] == [1000.0, 1100.0]
+        assert columns['date'] == [datetime.date(2023, 1, 1), datetime.date(2023, 1, 2)]
+        assert len(HistoryCache(self.cache_path)) == 2
+        # the cache opened from the path is closed
+        close.assert_called_once()
+
+    @responses.activate
+    def test_resume_from_cache(self):
+        # Arrange
+        cache = HistoryCache(self.cache_path)
+        cache.put('bitcoin', '2023-01-01', history(100.0))
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/history?localization=false&date=02-01-2023',
+                      status=500)
+
+        # Act
+        with pytest.raises(Exception):
+            get_coins_history_range(CoinGeckoAPI(retries=0), ['bitcoin'], '2023-01-01', '2023-01-02', cache=cache)
+        responses.replace(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/history?localization=false&date=02-01-2023',
+                          json=history(110.0), status=200)
+        columns = get_coins_history_range(CoinGeckoAPI(), ['bitcoin'], '2023-01-01', '2023-01-02', cache=cache)
+
+        ## Assert
+        assert columns['price'] == [100.0, 110.0]
+        assert [call.request.url.split('date=')[1] for call in responses.calls] == ['02-01-2023', '02-01-2023']
+
+    def test_get_many_reads_the_requested_dates(self):
+        # Arrange
+        cache = HistoryCache(self.cache_path)
+        for day in range(1, 6):
+            cache.put('bitcoin', datetime.date(2023, 1, day), history(100.0 + day))
+        cache.put('ethereum', '2023-01-02', history(10.0))
+
+        # Act
+        dates = cache.get_many(['bitcoin'], '2023-01-02', datetime.date(2023, 1, 3))
+
+        ## Assert
+        assert sorted(dates) == [('bitcoin', '2023-01-02'), ('bitcoin', '2023-01-03')]
+        assert len(cache.get_many(['bitcoin', 'ethereum'])) == 6
+        assert list(cache.get_many(['bitcoin'], start='2023-01-05')) == [('bitcoin', '2023-01-05')]
+
+    @responses.activate
+    def test_today_is_not_cached(self):
+        # Arrange
+        today = datetime.datetime.now(datetime.timezone.utc).date()
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/history?localization=false&date={0}'.format(today.strftime('%d-%m-%Y')),
+                      json=history(100.0), status=200)
+        cache = HistoryCache()
+
+        # Act
+        get_coins_history_range(CoinGeckoAPI(), ['bitcoin'], today, today, cache=cache)
+
+        ## Assert
+        assert len(cache) == 0
@@ -0,0 +1,56 @@
+import unittest
+
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.utils import fields_tree, project_content
+
+
+class TestLean(unittest.TestCase):
+
+    def test_fields_tree(self):
+        assert fields_tree(['id', 'market_data.current_price.usd', 'market_data.market_cap']) == \
+               {'id': None, 'market_data': {'current_price': {'usd': None}, 'market_cap': None}}
+        assert fields_tree(['market_data', 'market_data.current_price']) == {'market_data': None}
+
+    def test_project_content(self):
+        records = [{"id": "bitcoin", "current_price": 27000, "roi": None, "image": "https://..."},
+                   {"id": "ethereum", "current_price": 1600}]
+        pools = {"data": [{"id": "eth_0x88", "type": "pool",
+                           "attributes": {"name": "WETH / USDC", "reserve_in_usd": "1000", "fdv_usd": "1"}}],
+                 "included": [{"id": "eth_0xc0", "type": "token", "attributes": {"name": "WETH"}}]}
+
+        assert project_content(records, ['id', 'current_price']) == [{"id": "bitcoin", "current_price": 27000},
+                                                                      {"id": "ethereum", "current_price": 1600}]
+        assert project_content(pools, ['attributes.name']) == {
+            "data": [{"id": "eth_0x88", "type": "pool", "attributes": {"name": "WETH / USDC"}}],
+            "included": [{"id": "eth_0xc0", "type": "token", "attributes": {"name": "WETH"}}]}
+
+    @responses.activate
+    def test_lean_get_coin_by_id(self):
+        # Arrange
+        json_response = {"id": "bitcoin", "symbol": "btc", "description": {"en": "..."},
+                         "market_data": {"current_price": {"usd": 27000, "eur": 25000}, "ath": {"usd": 69000}}}
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin?localization=false&tickers=true&community_data=false&developer_data=false',
+                      json=json_response, status=200)
+
+        # Act
+        response = CoinGeckoAPI(lean=True).get_coin_by_id('bitcoin', tickers=True,
+                                                          fields=['id', 'market_data.current_price.usd'])
+
+        ## Assert
+        assert response == {"id": "bitcoin", "market_data": {"current_price": {"usd": 27000}}}
+        assert 'tickers=true' in responses.calls[0].request.url
+
+    @responses.activate
+    def test_default_client_is_not_lean(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin',
+                      json={"id": "bitcoin"}, status=200)
+
+        # Act
+        response = CoinGeckoAPI().get_coin_by_id('bitcoin')
+
+        ## Assert
+        assert response == {"id": "bitcoin"}
+        assert responses.calls[0].request.url == 'https://api.coingecko.com/api/v3/coins/bitcoin'
@@ -0,0 +1,129 @@
+import datetime
+import os
+import tempfile
+import time
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.exceptions import BudgetExceeded, DeadlineExceeded
+from pycoingecko.ledger import UsageLedger, usage_tag
+from pycoingecko.resilience import CircuitBreaker
+
+
+class TestLedger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'usage.sqlite')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    @responses.activate
+    def test_counts_calls_per_method_and_tag(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={'gecko_says': 'pong'}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/list', json=[], status=200)
+        ledger = UsageLedger(self.path)
+        cg = CoinGeckoAPI(ledger=ledger)
+
+        # Act
+        cg.ping()
+        with usage_tag('backfill'):
+            cg.ping()
+            cg.get_coins_list()
+        ledger.close()
+
+        ## Assert
+        assert UsageLedger(self.path).usage() == {('ping', None): 1, ('ping', 'backfill'): 1,
+                                                  ('get_coins_list', 'backfill'): 1}
+
+    @responses.activate
+    def test_budgets(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={'gecko_says': 'pong'}, status=200)
+        cg = CoinGeckoAPI(ledger=UsageLedger(soft_budget=1, hard_budget=2))
+
+        # Act
+        cg.ping()
+        with usage_tag('dashboard', priority='low'):
+            with pytest.raises(BudgetExceeded) as soft:
+                cg.ping()
+        cg.ping()
+
+        ## Assert
+        assert soft.value.budget == 'soft'
+        with pytest.raises(BudgetExceeded) as hard:
+            cg.ping()
+        assert hard.value.budget == 'hard'
+        assert hard.value.used == 2
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_refused_call_keeps_half_open_circuit_usable(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={}, status=500)
+        ledger = UsageLedger(hard_budget=1)
+        cg = CoinGeckoAPI(retries=0, circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=0),
+                          ledger=ledger)
+        with pytest.raises(ValueError):
+            cg.ping()
+
+        # Act
+        with pytest.raises(BudgetExceeded):
+            cg.ping()
+        ledger.hard_budget = None
+        responses.replace(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={'gecko_says': 'pong'},
+                          status=200)
+
+        ## Assert
+        assert cg.ping() == {'gecko_says': 'pong'}
+
+    @responses.activate
+    def test_throttle_is_bounded_by_deadline(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={'gecko_says': 'pong'}, status=200)
+        cg = CoinGeckoAPI(ledger=UsageLedger(soft_budget=0, soft_throttle=0.3))
+
+        # Act
+        start = time.monotonic()
+        with usage_tag('dashboard', priority='low'):
+            with pytest.raises(DeadlineExceeded) as exceeded:
+                cg.ping(deadline=0.2)
+
+        ## Assert
+        assert time.monotonic() - start < 0.3
+        assert exceeded.value.progress == {'endpoint': 'ping'}
+        assert len(responses.calls) == 0
+
+    def test_projected_monthly(self):
+        # Arrange
+        ledger = UsageLedger()
+        for _ in range(10):
+            ledger.record('get_price')
+
+        # Act
+        now = datetime.datetime.now(datetime.timezone.utc)
+        midday = now.replace(day=15, hour=12, minute=0, second=0, microsecond=0)
+        days = (now.replace(day=28) + datetime.timedelta(days=4)).replace(day=1) - now.replace(day=1)
+
+        ## Assert
+        assert ledger.projected_monthly(midday) == pytest.approx(10 * days.days / 14.5)
+
+    def test_shared_file(self):
+        # Arrange
+        first, second = UsageLedger(self.path), UsageLedger(self.path)
+
+        # Act
+        first.record('get_price')
+        second.record('get_price')
+        first.flush()
+        second.flush()
+
+        ## Assert
+        assert first.month_calls == 1
+        assert second.month_calls == 2
+        assert first.usage() == {('get_price', None): 2}
@@ -0,0 +1,55 @@
+import unittest
+
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.onchain import get_onchain_pools_batched, get_onchain_token_prices_batched, group_by_network
+
+
+class TestOnchain(unittest.TestCase):
+
+    def test_group_by_network(self):
+        # Arrange
+        addresses = [('eth', '0x1'), ('solana', 'So1'), ('eth', '0x2'), ('eth', '0x1')]
+
+        # Act Assert
+        assert group_by_network(addresses) == {'eth': ['0x1', '0x2'], 'solana': ['So1']}
+        assert group_by_network({'eth': ['0x1', '0x1']}) == {'eth': ['0x1']}
+
+    @responses.activate
+    def test_get_onchain_pools_batched(self):
+        # Arrange
+        token = {"id": "eth_0xweth", "type": "token"}
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/onchain/networks/eth/pools/multi/0x1,0x2',
+                      json={"data": [{"id": "eth_0x1", "type": "pool"}, {"id": "eth_0x2", "type": "pool"}],
+                            "included": [token]}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/onchain/networks/eth/pools/multi/0x3',
+                      json={"data": [{"id": "eth_0x3", "type": "pool"}], "included": [token]}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/onchain/networks/bsc/pools/multi/0x4',
+                      json={"data": [{"id": "bsc_0x4", "type": "pool"}]}, status=200)
+
+        # Act
+        result = get_onchain_pools_batched(CoinGeckoAPI(), {'eth': ['0x1', '0x2', '0x3'], 'bsc': ['0x4']},
+                                           chunk_size=2)
+
+        ## Assert
+        assert sorted(result['data']) == ['bsc_0x4', 'eth_0x1', 'eth_0x2', 'eth_0x3']
+        assert result['included'] == {'eth_0xweth': token}
+        assert len(responses.calls) == 3
+
+    @responses.activate
+    def test_get_onchain_token_prices_batched(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/onchain/simple/networks/eth/token_price/0x1,0x2',
+                      json={"data": {"id": "1", "type": "simple_token_price",
+                                     "attributes": {"token_prices": {"0x1": "1.01", "0x2": "2500.5"}}}}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/onchain/simple/networks/eth/token_price/0x3',
+                      json={"data": {"id": "2", "type": "simple_token_price",
+                                     "attributes": {"token_prices": {"0x3": "0.5"}}}}, status=200)
+
+        # Act
+        prices = get_onchain_token_prices_batched(CoinGeckoAPI(), [('eth', '0x1'), ('eth', '0x2'), ('eth', '0x3')],
+                                                  chunk_size=2)
+
+        ## Assert
+        assert prices == {'eth': {'0x1': '1.01', '0x2': '2500.5', '0x3': '0.5'}}
@@ -0,0 +1,43 @@
+import threading
+import unittest
+
+from pycoingecko.paging import iter_pages
+
+
+class TestIterPages(unittest.TestCase):
+
+    def fetch(self, sizes):
+        """Return a fetch_page returning sizes[page] items and the list of the pages it fetched"""
+
+        fetched = []
+        lock = threading.Lock()
+
+        def fetch_page(page):
+            with lock:
+                fetched.append(page)
+            return [page] * sizes.get(page, 0)
+
+        return fetch_page, fetched
+
+    def test_single_page_is_fetched_alone(self):
+        # Arrange
+        fetch_page, fetched = self.fetch({1: 1})
+
+        # Act
+        pages = list(iter_pages(fetch_page, 2, max_workers=8))
+
+        ## Assert
+        assert pages == [[1]]
+        assert fetched == [1]
+
+    def test_widens_window_while_pages_are_full(self):
+        # Arrange
+        fetch_page, fetched = self.fetch({1: 2, 2: 2, 3: 2, 4: 1})
+
+        # Act
+        pages = list(iter_pages(fetch_page, 2, max_workers=8))
+
+        ## Assert
+        assert pages == [[1, 1], [2, 2], [3, 3], [4]]
+        # page 1 alone, then one more page in flight per full page
+        assert max(fetched) <= 7
@@ -0,0 +1,65 @@
+import unittest
+
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.planner import plan_query, query_coins
+
+
+class TestPlanner(unittest.TestCase):
+
+    def test_plan_simple_price(self):
+        # Act
+        plan = plan_query(['coin-{0}'.format(i) for i in range(600)], ['current_price', 'market_cap'])
+
+        ## Assert
+        assert [step.method for step in plan.steps] == ['get_price']
+        assert plan.steps[0].fields == {'current_price': 'usd', 'market_cap': 'usd_market_cap'}
+        assert plan.requests == 3
+
+    def test_plan_markets_and_per_coin(self):
+        # Act
+        markets = plan_query(['bitcoin', 'ethereum'], ['current_price', 'ath_date'])
+        mixed = plan_query(['bitcoin', 'ethereum'], ['ath_date', 'categories'])
+        per_coin = plan_query(['bitcoin', 'ethereum'], ['current_price', 'categories'], vs_currency='eur')
+
+        ## Assert
+        assert [step.method for step in markets.steps] == ['get_coins_markets']
+        assert markets.requests == 1
+        assert [step.method for step in mixed.steps] == ['get_coins_markets', 'get_coin_by_id']
+        assert mixed.requests == 3
+        assert [step.method for step in per_coin.steps] == ['get_coin_by_id']
+        assert per_coin.steps[0].fields == {'current_price': 'market_data.current_price.eur',
+                                            'categories': 'categories'}
+        assert per_coin.requests == 2
+
+    @responses.activate
+    def test_query_coins_simple_price(self):
+        # Arrange
+        json_response = {"bitcoin": {"usd": 27000, "usd_24h_vol": 1e10}, "ethereum": {"usd": 1600, "usd_24h_vol": 5e9}}
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/simple/price?include_24hr_vol=true&ids=bitcoin,ethereum,unknown&vs_currencies=usd',
+                      json=json_response, status=200)
+
+        # Act
+        values = query_coins(CoinGeckoAPI(), ['bitcoin', 'ethereum', 'unknown'], ['current_price', 'total_volume'])
+
+        ## Assert
+        assert values == {'bitcoin': {'current_price': 27000, 'total_volume': 1e10},
+                          'ethereum': {'current_price': 1600, 'total_volume': 5e9},
+                          'unknown': {'current_price': None, 'total_volume': None}}
+        assert len(responses.calls) == 1
+
+    @responses.activate
+    def test_query_coins_per_coin(self):
+        # Arrange
+        for id, price in (('bitcoin', 27000), ('ethereum', 1600)):
+            responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/{0}?localization=false&tickers=false&market_data=true&community_data=false&developer_data=false'.format(id),
+                          json={"id": id, "categories": ["Layer 1"], "market_data": {"current_price": {"usd": price}}},
+                          status=200)
+
+        # Act
+        values = query_coins(CoinGeckoAPI(), ['bitcoin', 'ethereum'], ['current_price', 'categories'])
+
+        ## Assert
+        assert values['ethereum'] == {'current_price': 1600, 'categories': ['Layer 1']}
+        assert len(responses.calls) == 2
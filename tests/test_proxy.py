@@ -0,0 +1,111 @@
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.proxy import CachingProxy, make_server
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """Stand-in upstream answering every request after a short delay"""
+
+    calls = []
+
+    def do_GET(self):
+        self.calls.append(self.path)
+        time.sleep(0.05)
+        body = json.dumps({"path": self.path}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start(server):
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+class TestProxy(unittest.TestCase):
+
+    def setUp(self):
+        UpstreamHandler.calls = []
+        self.upstream = start(ThreadingHTTPServer(('127.0.0.1', 0), UpstreamHandler))
+        self.servers = [self.upstream]
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def client(self, **kwargs):
+        upstream = 'http://127.0.0.1:{0}/api/v3/'.format(self.upstream.server_port)
+        proxy = CachingProxy(upstream=upstream, **kwargs)
+        server = start(make_server(proxy, port=0))
+        self.servers.append(server)
+        return proxy, CoinGeckoAPI(api_base_url='http://127.0.0.1:{0}/api/v3'.format(server.server_port))
+
+    def test_cache(self):
+        # Arrange
+        proxy, cg = self.client(rate=0)
+
+        # Act
+        first = cg.get_price('bitcoin', 'usd')
+        second = cg.get_price('bitcoin', 'usd')
+        cg.get_price('ethereum', 'usd')
+
+        ## Assert
+        assert first == second == {"path": "/api/v3/simple/price?ids=bitcoin&vs_currencies=usd"}
+        assert len(UpstreamHandler.calls) == 2
+        assert proxy.stats['hits'] == 1
+
+    def test_cache_eviction(self):
+        # Arrange
+        proxy, cg = self.client(rate=0, ttl=0.5, max_entries=2)
+
+        # Act
+        for coin in ('bitcoin', 'ethereum', 'dogecoin'):
+            cg.get_price(coin, 'usd')
+        evicted = len(proxy._cache)
+        time.sleep(0.6)
+        cg.ping()
+
+        ## Assert
+        assert evicted == 2
+        assert list(proxy._cache) == ['ping']
+
+    def test_coalescing(self):
+        # Arrange
+        proxy, cg = self.client(rate=0)
+        results = []
+
+        # Act
+        threads = [threading.Thread(target=lambda: results.append(cg.ping())) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        ## Assert
+        assert len(results) == 8
+        assert len(UpstreamHandler.calls) == 1
+        assert proxy.stats['hits'] + proxy.stats['coalesced'] == 7
+
+    def test_rate_limit(self):
+        # Arrange
+        proxy, cg = self.client(rate=1, max_wait=0)
+        cg.ping()
+
+        # Act Assert
+        with pytest.raises(ValueError):
+            cg.get_price('bitcoin', 'usd')
+        assert proxy.stats['throttled'] == 1
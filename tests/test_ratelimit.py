@@ -0,0 +1,109 @@
+import threading
+import time
+import unittest
+
+import requests
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.paging import iter_pages, map_concurrent
+from pycoingecko.ratelimit import AdaptiveConcurrencyLimiter, is_overload_error
+
+
+def http_error(status):
+    response = requests.Response()
+    response.status_code = status
+    return requests.exceptions.HTTPError(response=response)
+
+
+class TestAdaptiveConcurrencyLimiter(unittest.TestCase):
+
+    def test_additive_increase(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_window=2, max_window=4)
+
+        # Act
+        for _ in range(20):
+            limiter.release(limiter.acquire())
+
+        ## Assert
+        assert limiter.window == 4
+        assert limiter.stats['requests'] == 20
+
+    def test_multiplicative_decrease_once_per_round(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_window=8)
+        started = [limiter.acquire() for _ in range(4)]
+
+        # Act
+        for started_at in started:
+            limiter.release(started_at, failed=True)
+
+        ## Assert
+        assert limiter.window == 4
+        assert limiter.stats['failures'] == 4
+        assert limiter.stats['decreases'] == 1
+        assert limiter.in_flight == 0
+
+    def test_latency_spike_decreases(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_window=8, min_samples=3, latency_factor=3.0)
+        for _ in range(3):
+            limiter.release(limiter.acquire())
+
+        # Act
+        limiter.release(limiter.acquire() - 1.0)
+
+        ## Assert
+        assert limiter.window == 4
+        assert limiter.stats['failures'] == 0
+
+    def test_window_bounds_in_flight_calls(self):
+        # Arrange
+        limiter = AdaptiveConcurrencyLimiter(initial_window=2, max_window=2)
+        in_flight = []
+        lock = threading.Lock()
+        running = [0]
+
+        def call(item):
+            with lock:
+                running[0] += 1
+                in_flight.append(running[0])
+            time.sleep(0.01)
+            with lock:
+                running[0] -= 1
+            return item
+
+        # Act
+        results = list(map_concurrent(call, range(10), limiter=limiter))
+
+        ## Assert
+        assert results == list(range(10))
+        assert max(in_flight) <= 2
+
+    def test_is_overload_error(self):
+        assert is_overload_error(http_error(429))
+        assert is_overload_error(http_error(503))
+        assert is_overload_error(requests.exceptions.ConnectTimeout())
+        assert not is_overload_error(http_error(404))
+        assert not is_overload_error(KeyError('id'))
+
+    @responses.activate
+    def test_backs_off_on_429_while_paging(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&per_page=2&page=1',
+                      json=[{"id": "bitcoin"}, {"id": "ethereum"}], status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/markets?vs_currency=usd&per_page=2&page=2',
+                      json={"status": {"error_code": 429, "error_message": "rate limited"}}, status=429)
+        cg = CoinGeckoAPI()
+        limiter = AdaptiveConcurrencyLimiter(initial_window=4)
+
+        # Act
+        pages = iter_pages(lambda page: cg.get_coins_markets('usd', per_page=2, page=page), 2, max_pages=2,
+                           limiter=limiter)
+
+        ## Assert
+        with self.assertRaises(ValueError):
+            list(pages)
+        assert limiter.window == 2
+        assert limiter.stats['failures'] == 1
@@ -0,0 +1,183 @@
+import threading
+import time
+import unittest
+
+import pytest
+import requests.exceptions
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.exceptions import CircuitOpenError
+from pycoingecko.resilience import CircuitBreaker, StaleWhileRevalidate, OPEN, HALF_OPEN, CLOSED
+from pycoingecko.transport import build_response
+
+
+class TestCircuitBreaker(unittest.TestCase):
+
+    def test_states(self):
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+
+        # Act Assert
+        breaker.record_failure('ping')
+        assert breaker.state('ping') == CLOSED
+        breaker.record_failure('ping')
+        assert breaker.state('ping') == OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('ping')
+        # other endpoints are not affected
+        breaker.before_request('simple/price')
+
+        time.sleep(0.06)
+        assert breaker.state('ping') == HALF_OPEN
+        assert breaker.before_request('ping')
+        # a single trial while half-open
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('ping')
+        breaker.record_success('ping', trial=True)
+        assert breaker.state('ping') == CLOSED
+
+    def test_release_ends_trial(self):
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure('ping')
+        breaker.before_request('ping')
+
+        # Act
+        breaker.release('ping')
+
+        ## Assert
+        breaker.before_request('ping')
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('ping')
+
+    def test_endpoints_share_the_circuit_of_their_template(self):
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=2)
+        per_path = CircuitBreaker(failure_threshold=2, key=lambda endpoint: endpoint)
+
+        # Act
+        for coin in ('bitcoin', 'ethereum'):
+            breaker.record_failure('coins/{0}/tickers'.format(coin))
+            per_path.record_failure('coins/{0}/tickers'.format(coin))
+
+        ## Assert
+        assert breaker.state('coins/dogecoin/tickers') == OPEN
+        assert breaker.state('coins/dogecoin') == CLOSED
+        assert per_path.state('coins/bitcoin/tickers') == CLOSED
+
+    def test_only_the_trial_ends_the_trial(self):
+        # Arrange
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        # a request sent while the circuit is closed
+        assert not breaker.before_request('ping')
+        breaker.record_failure('ping')
+        assert breaker.before_request('ping')
+
+        # Act
+        breaker.record_success('ping')
+        breaker.record_failure('ping')
+
+        ## Assert
+        with pytest.raises(CircuitOpenError):
+            breaker.before_request('ping')
+        assert breaker.state('ping') == HALF_OPEN
+        breaker.record_success('ping', trial=True)
+        assert breaker.state('ping') == CLOSED
+
+    @responses.activate
+    def test_client_fails_fast(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd',
+                      status=429)
+        cg = CoinGeckoAPI(circuit_breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+
+        # Act
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError):
+                cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        with pytest.raises(CircuitOpenError):
+            cg.get_price('bitcoin', 'usd')
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_client_errors_do_not_trip(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', status=404)
+        cg = CoinGeckoAPI(circuit_breaker=CircuitBreaker(failure_threshold=1))
+
+        # Act
+        for _ in range(2):
+            with pytest.raises(requests.exceptions.HTTPError):
+                cg.ping()
+
+        ## Assert
+        assert cg.circuit_breaker.state('ping') == CLOSED
+
+
+class TestStaleWhileRevalidate(unittest.TestCase):
+
+    @responses.activate
+    def test_serves_stale_and_refreshes(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={"n": 1}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={"n": 2}, status=200)
+        swr = StaleWhileRevalidate(max_age=0, max_workers=1)
+        cg = CoinGeckoAPI(stale_while_revalidate=swr)
+
+        # Act
+        first = cg.ping()
+        stale = cg.ping()
+        done = threading.Event()
+        swr._executor.submit(done.set)
+        done.wait(1)
+        swr.max_age = 60
+        fresh = cg.ping()
+
+        ## Assert
+        assert first == {"n": 1}
+        assert stale == {"n": 1}
+        assert fresh == {"n": 2}
+
+    @responses.activate
+    def test_serves_stale_when_circuit_open(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', json={"n": 1}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/ping', status=503)
+        swr = StaleWhileRevalidate(max_age=0, max_workers=1)
+        cg = CoinGeckoAPI(retries=0, circuit_breaker=CircuitBreaker(failure_threshold=1, reset_timeout=60),
+                          stale_while_revalidate=swr)
+        cg.ping()
+
+        # Act
+        results = [cg.ping() for _ in range(3)]
+        done = threading.Event()
+        swr._executor.submit(done.set)
+        done.wait(1)
+
+        ## Assert
+        assert results == [{"n": 1}] * 3
+        assert cg.circuit_breaker.state('ping') == OPEN
+
+    def test_evicts_least_recently_used(self):
+        # Arrange
+        swr = StaleWhileRevalidate(max_age=60, max_entries=2)
+        fetched = []
+
+        def fetch(url):
+            fetched.append(url)
+            return build_response(url, 200, '{}')
+
+        # Act
+        swr.get('a', fetch)
+        swr.get('b', fetch)
+        swr.get('a', fetch)
+        swr.get('c', fetch)
+        swr.get('a', fetch)
+        swr.get('b', fetch)
+
+        ## Assert
+        assert fetched == ['a', 'b', 'c', 'b']
+        assert list(swr._responses) == ['a', 'b']
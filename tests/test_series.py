@@ -0,0 +1,91 @@
+import unittest
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from pycoingecko import series
+
+
+class TestSeries(unittest.TestCase):
+
+    def setUp(self):
+        # 5-minute points over two hours for bitcoin, one hour for ethereum
+        hour = 3600 * 1000
+        self.charts = {
+            'bitcoin': {
+                'prices': [[i * 300000, 100.0 + i] for i in range(24)],
+                'market_caps': [[i * 300000, 1e9] for i in range(24)],
+                'total_volumes': [[i * 300000, 10.0] for i in range(24)],
+            },
+            'ethereum': {
+                'prices': [[2 * hour + i * 300000, 10.0] for i in range(12)],
+                'market_caps': [[2 * hour + i * 300000, 1e8] for i in range(12)],
+                'total_volumes': [[2 * hour + i * 300000, 5.0] for i in range(12)],
+            },
+        }
+
+    def test_interval_to_ms(self):
+        assert series.interval_to_ms('5m') == 300000
+        assert series.interval_to_ms('1d') == 86400000
+        assert series.interval_to_ms(60) == 60000
+
+    def test_resample(self):
+        # Act
+        bars = series.resample(series.market_charts_to_columns(self.charts), '1h')
+
+        ## Assert
+        assert bars['coin'].tolist() == ['bitcoin', 'bitcoin', 'ethereum']
+        assert bars['timestamp'].tolist() == [0, 3600000, 7200000]
+        assert bars['open'].tolist() == [100.0, 112.0, 10.0]
+        assert bars['high'].tolist() == [111.0, 123.0, 10.0]
+        assert bars['close'].tolist() == [111.0, 123.0, 10.0]
+        assert bars['count'].tolist() == [12, 12, 12]
+        assert bars['vwap'][0] == pytest.approx(105.5)
+        # rolling 24h volumes are not summed
+        assert bars['volume'].tolist() == [10.0, 10.0, 5.0]
+
+    def test_resample_ohlc(self):
+        # Arrange
+        # candles stamped with their close time: 00:30 and 01:00 make the 00:00-01:00 bar
+        ohlc = [[1800000, 1, 2, 0.5, 1.5], [3600000, 1.5, 3, 1, 2], [5400000, 2, 2.5, 1.8, 2.2]]
+
+        # Act
+        bars = series.resample_ohlc(series.ohlcs_to_columns({'bitcoin': ohlc}), '1h')
+        by_open = series.resample_ohlc(series.ohlcs_to_columns({'bitcoin': ohlc}), '1h', label='open')
+
+        ## Assert
+        assert bars['timestamp'].tolist() == [3600000, 7200000]
+        assert by_open['timestamp'].tolist() == [0, 3600000]
+        assert by_open['open'].tolist() == [1, 1.5]
+        assert bars['open'].tolist() == [1, 2]
+        assert bars['high'].tolist() == [3, 2.5]
+        assert bars['low'].tolist() == [0.5, 1.8]
+        assert bars['close'].tolist() == [2, 2.2]
+
+    def test_fill_gaps(self):
+        # Arrange
+        columns = series.ohlcs_to_columns({'bitcoin': [[0, 1, 1, 1, 1], [3 * 3600000, 2, 2, 2, 2]]})
+
+        # Act
+        filled = series.fill_gaps(columns, '1h')
+
+        ## Assert
+        assert filled['timestamp'].tolist() == [0, 3600000, 7200000, 10800000]
+        assert filled['close'].tolist() == [1, 1, 1, 2]
+        assert filled['open'].tolist() == [1, 1, 1, 2]
+        assert filled['filled'].tolist() == [False, True, True, False]
+
+    def test_returns_and_vwap(self):
+        # Arrange
+        bars = series.resample(series.market_charts_to_columns(self.charts), '1h')
+
+        # Act
+        result = series.returns(bars)
+        weighted = series.vwap(series.market_charts_to_columns(self.charts))
+
+        ## Assert
+        assert np.isnan(result[0]) and np.isnan(result[2])
+        assert result[1] == pytest.approx(123.0 / 111.0 - 1)
+        assert weighted['bitcoin'] == pytest.approx(111.5)
+        assert weighted['ethereum'] == pytest.approx(10.0)
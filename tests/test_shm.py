@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import tempfile
+import threading
+import unittest
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.shm import SEQUENCE, SEQUENCE_OFFSET, PricePublisher, PriceTable
+
+
+def read_price(path, queue):
+    with PriceTable(path) as table:
+        queue.put(table.get('bitcoin', 'usd'))
+
+
+class TestPriceTable(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'prices.bin')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def test_write_and_read(self):
+        # Arrange
+        writer = PriceTable(self.path, ['bitcoin', 'ethereum'], ['usd', 'eur'])
+
+        # Act
+        writer.write({'bitcoin': {'usd': 27000.0, 'eur': 25000.0}, 'unknown': {'usd': 1.0}})
+
+        ## Assert
+        with PriceTable(self.path) as reader:
+            assert reader.get('bitcoin', 'USD') == 27000.0
+            assert reader.get('ethereum', 'usd') is None
+            assert reader.snapshot() == {'bitcoin': {'usd': 27000.0, 'eur': 25000.0}, 'ethereum': {}}
+            assert reader.sequence == 2
+            with pytest.raises(KeyError):
+                reader.get('dogecoin', 'usd')
+        writer.close()
+
+    def test_other_process_reader(self):
+        # Arrange
+        with PriceTable(self.path, ['bitcoin'], ['usd']) as writer:
+            writer.write({'bitcoin': {'usd': 27000.0}})
+            queue = multiprocessing.Queue()
+
+            # Act
+            process = multiprocessing.Process(target=read_price, args=(self.path, queue))
+            process.start()
+            price = queue.get(timeout=10)
+            process.join()
+
+        ## Assert
+        assert price == 27000.0
+
+    def test_consistent_reads(self):
+        # Arrange
+        writer = PriceTable(self.path, ['bitcoin', 'ethereum'], ['usd'])
+        reader = PriceTable(self.path)
+        stop = threading.Event()
+
+        def write():
+            i = 0
+            while not stop.is_set():
+                i += 1
+                writer.write({'bitcoin': {'usd': float(i)}, 'ethereum': {'usd': float(i)}})
+
+        thread = threading.Thread(target=write)
+        thread.start()
+
+        # Act
+        snapshots = [reader.snapshot() for _ in range(2000)]
+        stop.set()
+        thread.join()
+
+        ## Assert
+        assert all(s['bitcoin'].get('usd') == s['ethereum'].get('usd') for s in snapshots)
+        reader.close()
+        writer.close()
+
+    def test_reopened_writer_reuses_the_file(self):
+        # Arrange
+        PriceTable(self.path, ['bitcoin'], ['usd']).close()
+        reader = PriceTable(self.path)
+
+        # Act
+        with PriceTable(self.path, ['bitcoin'], ['usd']) as writer:
+            writer.write({'bitcoin': {'usd': 27000.0}})
+
+        ## Assert
+        assert reader.get('bitcoin', 'usd') == 27000.0
+        reader.close()
+
+    def test_readers_follow_a_replaced_file(self):
+        # Arrange
+        PriceTable(self.path, ['bitcoin'], ['usd']).close()
+        reader = PriceTable(self.path)
+
+        # Act
+        with PriceTable(self.path, ['bitcoin', 'ethereum'], ['usd']) as writer:
+            writer.write({'ethereum': {'usd': 1800.0}})
+
+        ## Assert
+        assert reader.get('ethereum', 'usd') == 1800.0
+        assert reader.coins == ['bitcoin', 'ethereum']
+        reader.close()
+
+    def test_read_during_interrupted_write(self):
+        # Arrange
+        with PriceTable(self.path, ['bitcoin'], ['usd']) as writer:
+            writer.write({'bitcoin': {'usd': 27000.0}})
+            # a publisher killed mid-write leaves the sequence odd
+            SEQUENCE.pack_into(writer._map, SEQUENCE_OFFSET, writer.sequence + 1)
+        reader = PriceTable(self.path, read_timeout=0.05)
+
+        # Act Assert
+        with pytest.raises(TimeoutError):
+            reader.get('bitcoin', 'usd')
+        with pytest.raises(TimeoutError):
+            reader.snapshot()
+        with PriceTable(self.path, ['bitcoin'], ['usd']):
+            assert reader.get('bitcoin', 'usd') == 27000.0
+        reader.close()
+
+    @responses.activate
+    def test_publisher(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&vs_currencies=usd',
+                      json={'bitcoin': {'usd': 27000.0}, 'ethereum': {'usd': 1800.0}}, status=200)
+
+        # Act
+        with PricePublisher(CoinGeckoAPI(), self.path, ['bitcoin', 'ethereum'], ['usd']) as publisher:
+            publisher.publish()
+
+        ## Assert
+        with PriceTable(self.path) as reader:
+            assert reader.get('ethereum', 'usd') == 1800.0
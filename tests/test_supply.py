@@ -0,0 +1,89 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import pytest
+import responses
+
+from pycoingecko import CoinGeckoAPI
+
+np = pytest.importorskip('numpy')
+
+from pycoingecko.supply import WINDOW, SupplyCache, get_supply_charts  # noqa: E402
+
+
+class TestSupply(unittest.TestCase):
+
+    @responses.activate
+    def test_supply_chart_params(self):
+        # Arrange
+        responses.add(responses.GET, 'https://pro-api.coingecko.com/api/v3/coins/bitcoin/circulating_supply_chart?days=7&x_cg_pro_api_key=key',
+                      json={"circulating_supply": [[1000, "19000000.0"]]}, status=200)
+
+        # Act
+        response = CoinGeckoAPI(api_key='key').get_coin_circulating_supply_chart('bitcoin', 7)
+
+        ## Assert
+        assert response == {"circulating_supply": [[1000, "19000000.0"]]}
+
+    @responses.activate
+    def test_get_supply_charts_days(self):
+        # Arrange
+        for id in ('bitcoin', 'ethereum'):
+            responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/{0}/circulating_supply_chart?days=7'.format(id),
+                          json={"circulating_supply": [[1000, "10.0"], [3000, "12.0"]]}, status=200)
+            responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/{0}/total_supply_chart?days=7'.format(id),
+                          json={"total_supply": [[2000, "20.0"], [3000, None]]}, status=200)
+
+        # Act
+        columns = get_supply_charts(CoinGeckoAPI(), ['bitcoin', 'ethereum'], days=7)
+
+        ## Assert
+        assert columns['coin'].tolist() == ['bitcoin'] * 3 + ['ethereum'] * 3
+        assert columns['timestamp'].tolist() == [1000, 2000, 3000] * 2
+        np.testing.assert_array_equal(columns['circulating_supply'][:3], [10.0, 10.0, 12.0])
+        np.testing.assert_array_equal(columns['total_supply'][:3], [np.nan, 20.0, np.nan])
+
+    @responses.activate
+    def test_get_supply_charts_range_caches_completed_windows(self):
+        # Arrange
+        start = 100 * WINDOW
+        url = 'https://api.coingecko.com/api/v3/coins/bitcoin/total_supply_chart/range?from={0}&to={1}'
+        responses.add(responses.GET, url.format(start, start + WINDOW),
+                      json={"total_supply": [[(start + 10) * 1000, "1.0"], [(start + 20) * 1000, "2.0"]]}, status=200)
+        responses.add(responses.GET, url.format(start + WINDOW, start + 2 * WINDOW),
+                      json={"total_supply": [[(start + WINDOW + 10) * 1000, "3.0"]]}, status=200)
+        cache = SupplyCache()
+
+        # Act
+        columns = get_supply_charts(CoinGeckoAPI(), ['bitcoin'], from_timestamp=start + 15,
+                                    to_timestamp=start + WINDOW + 10, kinds=('total_supply',), cache=cache)
+        again = get_supply_charts(CoinGeckoAPI(), ['bitcoin'], from_timestamp=start + 15,
+                                  to_timestamp=start + WINDOW + 10, kinds=('total_supply',), cache=cache)
+
+        ## Assert
+        assert columns['total_supply'].tolist() == [2.0, 3.0]
+        assert again['timestamp'].tolist() == columns['timestamp'].tolist()
+        assert len(cache) == 2
+        assert len(responses.calls) == 2
+
+    @responses.activate
+    def test_closes_the_cache_it_opens(self):
+        # Arrange
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/total_supply_chart/range',
+                      json={"total_supply": []}, status=200)
+
+        # Act
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with mock.patch.object(SupplyCache, 'close', autospec=True, side_effect=SupplyCache.close) as close:
+                get_supply_charts(CoinGeckoAPI(), ['bitcoin'], from_timestamp=100 * WINDOW,
+                                  to_timestamp=100 * WINDOW + 10, kinds=('total_supply',),
+                                  cache=os.path.join(tmpdir, 'supply.sqlite'))
+
+        ## Assert
+        close.assert_called_once()
+
+    def test_requires_days_or_range(self):
+        with pytest.raises(ValueError):
+            get_supply_charts(CoinGeckoAPI(), ['bitcoin'])
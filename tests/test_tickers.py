@@ -0,0 +1,60 @@
+import unittest
+
+import pytest
+import responses
+
+np = pytest.importorskip('numpy')
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.tickers import aggregate_tickers, get_coin_tickers_all, tickers_to_columns
+
+
+def ticker(exchange, last, volume, spread, base='BTC', target='USDT', **kwargs):
+    return dict({"base": base, "target": target, "market": {"identifier": exchange}, "last": last, "volume": volume,
+                 "bid_ask_spread_percentage": spread, "cost_to_move_up_usd": 1000, "cost_to_move_down_usd": 2000},
+                **kwargs)
+
+
+class TestTickers(unittest.TestCase):
+
+    @responses.activate
+    def test_get_coin_tickers_all(self):
+        # Arrange
+        page_1 = [ticker('exchange{0}'.format(i), 27000, 1, 0.1) for i in range(100)]
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/tickers?page=1&depth=true',
+                      json={"name": "Bitcoin", "tickers": page_1}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/tickers?page=2&depth=true',
+                      json={"name": "Bitcoin", "tickers": [ticker('binance', 27000, 1, 0.1)]}, status=200)
+        responses.add(responses.GET, 'https://api.coingecko.com/api/v3/coins/bitcoin/tickers?page=3&depth=true',
+                      json={"name": "Bitcoin", "tickers": []}, status=200)
+
+        # Act
+        tickers = get_coin_tickers_all(CoinGeckoAPI(), 'bitcoin', depth=True, max_workers=3)
+
+        ## Assert
+        assert len(tickers) == 101
+        assert tickers[-1]['market']['identifier'] == 'binance'
+
+    def test_aggregate_tickers(self):
+        # Arrange
+        tickers = [
+            ticker('binance', 100.0, 3.0, 2.0),
+            ticker('kraken', 101.0, 1.0, 0.2),
+            ticker('stale', 90.0, 100.0, 0.0, is_stale=True),
+            ticker('coinbase', 2000.0, 5.0, 0.0, base='ETH', target='USD'),
+        ]
+
+        # Act
+        summary = aggregate_tickers(tickers_to_columns(tickers))
+
+        ## Assert
+        assert summary['pair'].tolist() == ['BTC/USDT', 'ETH/USD']
+        assert summary['best_bid'][0] == pytest.approx(101.0 * 0.999)
+        assert summary['best_bid_exchange'][0] == 'kraken'
+        assert summary['best_ask'][0] == pytest.approx(101.0)
+        assert summary['best_ask_exchange'][0] == 'binance'
+        assert summary['vwap'][0] == pytest.approx((100.0 * 3 + 101.0) / 4)
+        assert summary['volume'][0] == 4.0
+        assert summary['depth_up_usd'][0] == 2000
+        assert summary['exchanges'].tolist() == [2, 1]
+        assert summary['spread_percentage'][1] == 0
@@ -0,0 +1,114 @@
+import json
+import time
+import unittest
+
+import pytest
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.exceptions import DeadlineExceeded
+from pycoingecko.onchain import get_onchain_token_prices_batched
+from pycoingecko.timeouts import deadline
+from pycoingecko.transport import DeadlineRetry, build_response
+
+
+class SlowTransport:
+    """Transport answering every request after delay seconds and keeping the urls/timeouts it got"""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.urls = []
+        self.timeouts = []
+
+    def get(self, url, timeout=None):
+        self.urls.append(url)
+        self.timeouts.append(timeout)
+        time.sleep(self.delay)
+        return build_response(url, 200, json.dumps({"data": {"attributes": {"token_prices": {}}}}))
+
+
+class TestTimeouts(unittest.TestCase):
+
+    def test_default_timeout(self):
+        # Arrange
+        transport = SlowTransport()
+
+        # Act
+        CoinGeckoAPI(transport=transport).ping()
+
+        ## Assert
+        assert transport.timeouts == [120]
+
+    def test_connect_read_timeouts(self):
+        # Arrange
+        transport = SlowTransport()
+
+        # Act
+        CoinGeckoAPI(transport=transport, connect_timeout=3.05, read_timeout=10).ping()
+
+        ## Assert
+        assert transport.timeouts == [(3.05, 10)]
+
+    def test_per_call_timeout(self):
+        # Arrange
+        transport = SlowTransport()
+        cg = CoinGeckoAPI(transport=transport)
+
+        # Act
+        cg.get_price('bitcoin', 'usd', timeout=0.5)
+        cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert transport.timeouts == [0.5, 120]
+        assert transport.urls[0] == 'https://api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd'
+
+    def test_deadline_caps_timeout(self):
+        # Arrange
+        transport = SlowTransport()
+        cg = CoinGeckoAPI(transport=transport)
+
+        # Act
+        with cg.deadline(2):
+            cg.ping()
+            # nested deadlines never extend the outer one
+            with deadline(60):
+                cg.ping()
+
+        ## Assert
+        assert all(timeout <= 2 for timeout in transport.timeouts)
+
+    def test_deadline_exceeded(self):
+        # Arrange
+        cg = CoinGeckoAPI(transport=SlowTransport(delay=0.05))
+
+        # Act Assert
+        with pytest.raises(DeadlineExceeded):
+            with cg.deadline(0.01):
+                cg.ping()
+                cg.ping()
+
+    def test_deadline_exceeded_in_batches(self):
+        # Arrange
+        transport = SlowTransport(delay=0.05)
+        cg = CoinGeckoAPI(transport=transport)
+        tokens = [('eth', '0x{0}'.format(i)) for i in range(5)]
+
+        # Act
+        with pytest.raises(DeadlineExceeded) as e:
+            get_onchain_token_prices_batched(cg, tokens, chunk_size=1, max_workers=1, deadline=0.12)
+
+        ## Assert
+        assert 0 < e.value.progress['completed'] < 5
+        assert e.value.progress['total'] == 5
+        assert 'eth' in e.value.partial
+        assert len(transport.urls) < 5
+
+    def test_deadline_retry(self):
+        # Arrange
+        retry = DeadlineRetry(total=5, backoff_factor=10)
+
+        # Act Assert
+        assert not retry.is_exhausted()
+        with deadline(0):
+            assert retry.is_exhausted()
+        with deadline(0.5):
+            assert retry.new(total=3).get_backoff_time() <= 0.5
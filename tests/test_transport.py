@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+import unittest
+
+import pytest
+import requests.exceptions
+import responses
+
+from pycoingecko import CoinGeckoAPI
+from pycoingecko.transport import RecordingTransport, ReplayTransport, strip_api_key
+
+
+class TestTransport(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.tmpdir.name, 'cassette.jsonl.gz')
+
+    def tearDown(self):
+        self.tmpdir.cleanup()
+
+    def record(self):
+        responses.add(responses.GET, 'https://pro-api.coingecko.com/api/v3/simple/price?ids=bitcoin&vs_currencies=usd&x_cg_pro_api_key=secret',
+                      json={"bitcoin": {"usd": 27000}}, status=200)
+        with RecordingTransport(self.cassette) as transport:
+            CoinGeckoAPI(api_key='secret', transport=transport).get_price('bitcoin', 'usd')
+
+    def test_strip_api_key(self):
+        url = 'https://pro-api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum&x_cg_pro_api_key=secret'
+
+        assert strip_api_key(url) == 'https://pro-api.coingecko.com/api/v3/simple/price?ids=bitcoin,ethereum'
+
+    @responses.activate
+    def test_record_and_replay(self):
+        # Arrange
+        self.record()
+
+        # Act
+        transport = ReplayTransport(self.cassette)
+        response = CoinGeckoAPI(api_key='other', transport=transport).get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert response == {"bitcoin": {"usd": 27000}}
+        assert len(transport) == 1
+        with open(self.cassette, 'rb') as f:
+            assert b'secret' not in f.read()
+
+    @responses.activate
+    def test_replay_unknown_url(self):
+        # Arrange
+        self.record()
+        cg = CoinGeckoAPI(api_key='secret', transport=ReplayTransport(self.cassette))
+
+        # Act Assert
+        with pytest.raises(requests.exceptions.ConnectionError):
+            cg.get_price('ethereum', 'usd')
+
+    @responses.activate
+    def test_replay_error_injection(self):
+        # Arrange
+        self.record()
+        cg = CoinGeckoAPI(api_key='secret', transport=ReplayTransport(self.cassette, error_rate=1.0))
+
+        # Act Assert
+        with pytest.raises(ValueError):
+            cg.get_price('bitcoin', 'usd')
+
+    @responses.activate
+    def test_replay_latency(self):
+        # Arrange
+        self.record()
+        cg = CoinGeckoAPI(api_key='secret', transport=ReplayTransport(self.cassette, latency=0.05))
+
+        # Act
+        start = time.monotonic()
+        cg.get_price('bitcoin', 'usd')
+
+        ## Assert
+        assert time.monotonic() - start >= 0.05